@@ -1,15 +1,66 @@
 import streamlit as st
+from streamlit.errors import StreamlitAPIException
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 import random
 from datetime import datetime, timedelta
 import os
 import hashlib
+import functools
+from collections import deque
 import numpy as np
+import instrumentation
+from instrumentation import stage
+from storage import get_task_store, empty_tasks, ensure_columns, new_task_id, storage_frame
+from repository import TaskRepository, get_shared_repository
+from users import get_user_index
+from board import BOARD_PAGE_SIZES, DUE_WINDOWS, filter_board_tasks, split_columns, column_page, build_board_view
+from bulk import BULK_ACTIONS, BULK_SELECT_LIMIT, bulk_fields, bulk_targets, prepare_import, read_import
+from metrics import ANALYTICS_WINDOWS, CompletionRollups, get_task_metrics, window_bounds
+from charts import cached_figure, chart_inputs, status_pie, priority_bar, category_donut, completion_trend, accuracy_scatter, efficiency_gauge, weekday_bar
+
+VIEW_MODE = os.environ.get("VIEW_MODE", "lazy")
+# Users who get the rerun timing panel (comma-separated); DEBUG_PANEL=on shows it to everyone
+ADMIN_USERS = {name.strip().lower() for name in os.environ.get("ADMIN_USERS", "").split(",") if name.strip()}
+DEBUG_PANEL = os.environ.get("DEBUG_PANEL", "off") == "on"
+
+# Partial reruns need st.fragment (Streamlit 1.37+); without it every interaction reruns the whole script
+fragment = getattr(st, "fragment", None) or (lambda func: func)
+
+def rerun_fragment():
+    try:
+        st.rerun(scope="fragment")
+    except (TypeError, StreamlitAPIException):
+        # Older Streamlit, or called outside a fragment
+        st.rerun()
+
+try:
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+except ImportError:
+    get_script_run_ctx = lambda: None
+
+def remember_run(run):
+    # The last few runs of this session, for the timing panel
+    if run is not None:
+        st.session_state.setdefault("timing_runs", deque(maxlen=20)).append(run)
+
+def timed(name):
+    # A named stage around a view or fragment. A fragment rerunning on its own
+    # skips the top of the script, so it is recorded as a run of its own.
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            ctx = get_script_run_ctx()
+            if not getattr(ctx, "fragment_ids_this_run", None):
+                with stage(name):
+                    return func(*args, **kwargs)
+            current = None
+            try:
+                with instrumentation.run("fragment", st.session_state.get("current_user")) as current, stage(name):
+                    return func(*args, **kwargs)
+            finally:
+                remember_run(current)
+        return wrapper
+    return decorate
 
 # ------------------- Page Config -------------------
 st.set_page_config(
@@ -105,54 +156,24 @@ if "tasks" not in st.session_state:
     st.session_state["tasks"] = pd.DataFrame()
 
 # ------------------- Users CSV -------------------
-USERS_FILE = "users.csv"
+user_index = get_user_index()
 
 def hash_password(password):
     return hashlib.sha256(password.encode()).hexdigest()
 
-def load_users():
-    try:
-        if os.path.exists(USERS_FILE):
-            df = pd.read_csv(USERS_FILE)
-            if not all(col in df.columns for col in ["username", "password"]):
-                df = pd.DataFrame(columns=["username","password"])
-                df.to_csv(USERS_FILE, index=False)
-            return df
-        else:
-            df = pd.DataFrame(columns=["username","password"])
-            df.to_csv(USERS_FILE, index=False)
-            return df
-    except Exception as e:
-        st.error(f"Error loading users: {e}")
-        df = pd.DataFrame(columns=["username","password"])
-        df.to_csv(USERS_FILE, index=False)
-        return df
-
-def save_users(df):
-    try:
-        df.to_csv(USERS_FILE, index=False)
-    except Exception as e:
-        st.error(f"Error saving users: {e}")
-
 def user_exists(username):
     try:
-        df = load_users()
-        if df.empty:
-            return False
-        return username.lower() in df["username"].str.lower().values
+        return user_index.exists(username)
     except Exception as e:
         st.error(f"Error checking user existence: {e}")
         return False
 
 def validate_user(username, password):
     try:
-        df = load_users()
-        if df.empty:
+        stored_hash = user_index.password_hash(username)
+        if stored_hash is None:
             return "not_registered"
-        matches = df[df["username"].str.lower() == username.lower()]
-        if matches.empty:
-            return "not_registered"
-        elif matches.iloc[0]["password"] != hash_password(password):
+        elif stored_hash != hash_password(password):
             return "wrong_password"
         else:
             return "ok"
@@ -229,10 +250,9 @@ def login_register():
                     return False
                 elif action == "Register":
                     try:
-                        df = load_users()
-                        new_user = pd.DataFrame([{"username": username.lower(), "password": hash_password(password)}])
-                        df = pd.concat([df, new_user], ignore_index=True)
-                        save_users(df)
+                        if not user_index.add_user(username, hash_password(password)):
+                            st.warning("⚠️ Username already exists.")
+                            return False
                         st.session_state["current_user"] = username.lower()
                         st.session_state["logged_in"] = True
                         st.success(f"🎉 Welcome {username}! Registration successful!")
@@ -266,42 +286,122 @@ if not st.session_state["logged_in"]:
         st.stop()
 
 # ------------------- Task Storage -------------------
-def user_file():
-    return f"tasks_{st.session_state['current_user']}.csv"
+task_store = get_task_store()
 
 def init_user_file():
     try:
-        f = user_file()
-        if not os.path.exists(f):
-            df = pd.DataFrame(columns=["id","title","status","priority","tag","due_date","created_at","completed_at","estimated_hours","actual_hours"])
-            df.to_csv(f, index=False)
+        task_store.init_user(st.session_state["current_user"])
     except Exception as e:
         st.error(f"Error initializing user file: {e}")
 
 def load_tasks():
+    # Every session of a user shares one in-process repository; a revision this
+    # session has not seen means another tab or device wrote in the meantime
+    previous = st.session_state.get("task_repo")
     try:
-        f = user_file()
-        if os.path.exists(f):
-            df = pd.read_csv(f)
-            required_columns = ["id","title","status","priority","tag","due_date","created_at","completed_at","estimated_hours","actual_hours"]
-            for col in required_columns:
-                if col not in df.columns:
-                    df[col] = "" if col not in ["estimated_hours", "actual_hours"] else 0
-        else:
-            df = pd.DataFrame(columns=["id","title","status","priority","tag","due_date","created_at","completed_at","estimated_hours","actual_hours"])
-        st.session_state["tasks"] = df
+        repo = get_shared_repository(st.session_state["current_user"], task_store)
     except Exception as e:
         st.error(f"Error loading tasks: {e}")
-        st.session_state["tasks"] = pd.DataFrame(columns=["id","title","status","priority","tag","due_date","created_at","completed_at","estimated_hours","actual_hours"])
+        repo = TaskRepository(st.session_state["current_user"], task_store, df=ensure_columns(empty_tasks()))
+    if repo is previous and repo.revision != st.session_state.get("task_revision"):
+        st.toast("🔄 Tasks were updated in another session")
+    if repo.flush_error is not None and repo.pending:
+        st.warning(f"⚠️ {repo.pending} change(s) not saved yet, retrying: {repo.flush_error}")
+    # Edits given up after repeated failed flushes are reported once per session
+    dropped, seen = len(repo.dropped_changes), st.session_state.get("dropped_changes_seen", 0) if repo is previous else 0
+    if dropped > seen:
+        st.error(f"❌ {dropped - seen} change(s) could not be saved and were discarded: {repo.flush_error}")
+    st.session_state["dropped_changes_seen"] = dropped
+    st.session_state["task_repo"] = repo
+    st.session_state["task_revision"] = repo.revision
+    st.session_state["tasks"] = repo.df
+
+def sync_tasks():
+    # After this session's own write: pick up the new frame without announcing it as foreign
+    repo = st.session_state["task_repo"]
+    st.session_state["task_revision"] = repo.revision
+    st.session_state["tasks"] = repo.df
+
+def update_task(task_id, **fields):
+    try:
+        with stage("update_task", rows=1):
+            st.session_state["task_repo"].update_task(task_id, **fields)
+    except Exception as e:
+        st.error(f"Error updating task: {e}")
+    sync_tasks()
+
+def delete_task(task_id):
+    try:
+        with stage("delete_task", rows=1):
+            st.session_state["task_repo"].delete_task(task_id)
+    except Exception as e:
+        st.error(f"Error deleting task: {e}")
+    sync_tasks()
+
+def add_task(task):
+    try:
+        with stage("add_task", rows=1):
+            st.session_state["task_repo"].add_task(task)
+    except Exception as e:
+        st.error(f"Error adding task: {e}")
+    sync_tasks()
+
+def import_tasks(tasks):
+    # True when the tasks were written; the caller reruns (and reports) only then
+    try:
+        with stage("import_tasks", rows=len(tasks)):
+            st.session_state["task_repo"].add_tasks(tasks)
+    except Exception as e:
+        st.error(f"Error importing tasks: {e}")
+        return False
+    finally:
+        sync_tasks()
+    return True
+
+def bulk_update(task_ids, **fields):
+    try:
+        with stage("bulk_update", rows=len(task_ids)):
+            st.session_state["task_repo"].update_tasks(task_ids, **fields)
+    except Exception as e:
+        st.error(f"Error updating tasks: {e}")
+    sync_tasks()
 
-def save_tasks():
+def bulk_delete(task_ids):
     try:
-        st.session_state["tasks"].to_csv(user_file(), index=False)
+        with stage("bulk_delete", rows=len(task_ids)):
+            st.session_state["task_repo"].delete_tasks(task_ids)
     except Exception as e:
-        st.error(f"Error saving tasks: {e}")
+        st.error(f"Error deleting tasks: {e}")
+    sync_tasks()
+
+def task_metrics():
+    with stage("task_metrics", rows=len(st.session_state["tasks"])):
+        return get_task_metrics(st.session_state["tasks"], st.session_state["task_repo"].dataset_key)
+
+def analytics_tasks():
+    # Tasks in the selected date range, with the key their metrics and figures are cached under
+    repo = st.session_state["task_repo"]
+    bounds = st.session_state.get("analytics_range")
+    if bounds is None:
+        return st.session_state["tasks"], repo.dataset_key
+    dataset, version = repo.dataset_key
+    return repo.window(*bounds), ((dataset, bounds), version)
+
+def completion_rollups():
+    repo = st.session_state["task_repo"]
+    bounds = st.session_state.get("analytics_range")
+    if bounds is None:
+        return repo.rollups
+    return CompletionRollups(repo.window(*bounds, columns=["completed_at"]))
 
-init_user_file()
-load_tasks()
+# ------------------- Instrumentation -------------------
+# Everything below is one timed run; stages record wall time, rows and bytes
+# (see instrumentation.py). The run ends just before the timing panel.
+instrumentation.begin_run("rerun", st.session_state["current_user"])
+with stage("load_tasks"):
+    init_user_file()
+    load_tasks()
+    instrumentation.count(rows=len(st.session_state["tasks"]))
 
 # ------------------- Main Header (Only show before login) -------------------
 # This section is now moved to after login check
@@ -331,6 +431,80 @@ with quote_col:
     </div>
     """, unsafe_allow_html=True)
 
+# ------------------- Sidebar: Task Form -------------------
+# A fragment, so typing errors and duplicate warnings only redraw the form;
+# a created task reruns the whole app to refresh the board and stats.
+@fragment
+@timed("task_form")
+def task_form():
+    with st.form("task_form"):
+        title = st.text_input("📝 Task Title", placeholder="Enter task description...")
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            priority = st.selectbox("🎯 Priority", [1,2,3,4,5], 
+                                  format_func=lambda x: f"🔴 Critical" if x==1 else f"🟡 High" if x==2 else f"🟢 Medium" if x==3 else f"🔵 Low" if x==4 else "⚫ Minimal")
+        with col2:
+            estimated_hours = st.number_input("⏱️ Est. Hours", min_value=0.5, max_value=40.0, step=0.5, value=1.0)
+            
+        tag = st.selectbox("🏷️ Category", 
+                          ["Data Analysis", "Visualization", "Research", "Reporting", "Learning", "Meeting", "Other"])
+        due_date = st.date_input("📅 Due Date", min_value=datetime.now().date())
+        
+        submitted = st.form_submit_button("🚀 Add Task", use_container_width=True)
+        
+        if submitted:
+            if title.strip():
+                try:
+                    # A lookup in the user's (title, priority) index, however many tasks there are
+                    duplicate = st.session_state["task_repo"].find_duplicate(title, priority)
+                    if duplicate is not None:
+                        st.warning(f"⚠️ Similar task already exists: {duplicate.split('|', 1)[1]}")
+                    else:
+                        task_id = new_task_id()
+                        new_task = {
+                            "id": task_id,
+                            "title": title,
+                            "status": "To Do",
+                            "priority": priority,
+                            "tag": tag,
+                            "due_date": str(due_date),
+                            "created_at": datetime.now().isoformat(),
+                            "completed_at": "",
+                            "estimated_hours": estimated_hours,
+                            "actual_hours": 0
+                        }
+                        add_task(new_task)
+                        st.success("✅ Task created successfully!")
+                        st.rerun()
+                except Exception as e:
+                    st.error(f"Error adding task: {e}")
+            else:
+                st.warning("⚠️ Please enter a task title.")
+
+@fragment
+@timed("task_import")
+def task_import():
+    # Whole files go through one validation pass and one write, however many tasks they hold
+    report = st.session_state.pop("import_report", None)
+    if report is not None:
+        st.success(f"📥 Imported {report['imported']} of {report['rows']} rows "
+                   f"({report['duplicates']} duplicates, {report['invalid']} invalid skipped)")
+        for message in report["messages"]:
+            st.caption(f"⚠️ {message}")
+    uploaded = st.file_uploader("CSV or JSON with a title column", type=["csv", "json"], key="import_file")
+    if uploaded is not None and st.button("📥 Import Tasks", use_container_width=True, key="import_button"):
+        try:
+            repo = st.session_state["task_repo"]
+            tasks, report = prepare_import(read_import(uploaded.name, uploaded.getvalue()), repo.df, duplicates=repo.duplicates)
+            if len(tasks) and not import_tasks(tasks):
+                # Nothing was written: keep the error on screen instead of a success report
+                return
+            st.session_state["import_report"] = report
+            st.rerun()
+        except Exception as e:
+            st.error(f"Error importing tasks: {e}")
+
 with main_col:
     # ------------------- Sidebar: Enhanced Task Creation -------------------
     with st.sidebar:
@@ -343,87 +517,137 @@ with main_col:
         """, unsafe_allow_html=True)
         
         st.markdown("### ➕ Create New Task")
-    
-        with st.form("task_form"):
-            title = st.text_input("📝 Task Title", placeholder="Enter task description...")
-            
-            col1, col2 = st.columns(2)
-            with col1:
-                priority = st.selectbox("🎯 Priority", [1,2,3,4,5], 
-                                      format_func=lambda x: f"🔴 Critical" if x==1 else f"🟡 High" if x==2 else f"🟢 Medium" if x==3 else f"🔵 Low" if x==4 else "⚫ Minimal")
-            with col2:
-                estimated_hours = st.number_input("⏱️ Est. Hours", min_value=0.5, max_value=40.0, step=0.5, value=1.0)
-                
-            tag = st.selectbox("🏷️ Category", 
-                              ["Data Analysis", "Visualization", "Research", "Reporting", "Learning", "Meeting", "Other"])
-            due_date = st.date_input("📅 Due Date", min_value=datetime.now().date())
-            
-            submitted = st.form_submit_button("🚀 Add Task", use_container_width=True)
-            
-            if submitted:
-                if title.strip():
-                    try:
-                        df = st.session_state["tasks"]
-                        if not df.empty and len(df) > 0:
-                            duplicate_check = ((df["title"].str.lower() == title.lower()) & (df["priority"] == priority)).any()
-                        else:
-                            duplicate_check = False
-                            
-                        if duplicate_check:
-                            st.warning("⚠️ Similar task already exists!")
-                        else:
-                            task_id = str(datetime.now().timestamp()).replace(".", "")
-                            new_task = {
-                                "id": task_id,
-                                "title": title,
-                                "status": "To Do",
-                                "priority": priority,
-                                "tag": tag,
-                                "due_date": str(due_date),
-                                "created_at": datetime.now().isoformat(),
-                                "completed_at": "",
-                                "estimated_hours": estimated_hours,
-                                "actual_hours": 0
-                            }
-                            new_task_df = pd.DataFrame([new_task])
-                            st.session_state["tasks"] = pd.concat([df, new_task_df], ignore_index=True)
-                            save_tasks()
-                            st.success("✅ Task created successfully!")
-                            st.rerun()
-                    except Exception as e:
-                        st.error(f"Error adding task: {e}")
-                else:
-                    st.warning("⚠️ Please enter a task title.")
+        task_form()
+
+        with st.expander("📥 Import Tasks"):
+            task_import()
         
         # Quick Stats in Sidebar
         if not st.session_state["tasks"].empty:
-            df = st.session_state["tasks"]
+            metrics = task_metrics()
             st.markdown("### 📈 Quick Stats")
             col1, col2 = st.columns(2)
             with col1:
-                st.metric("📋 Total", len(df))
-                st.metric("✅ Done", len(df[df["status"]=="Done"]))
+                st.metric("📋 Total", metrics.total)
+                st.metric("✅ Done", metrics.done)
             with col2:
-                completion_rate = len(df[df["status"]=="Done"]) / len(df) * 100 if len(df) > 0 else 0
-                st.metric("🎯 Rate", f"{completion_rate:.0f}%")
-                st.metric("⚡ Active", len(df[df["status"]!="Done"]))
+                st.metric("🎯 Rate", f"{metrics.completion_rate:.0f}%")
+                st.metric("⚡ Active", metrics.active)
         
         st.markdown("---")
         if st.button("🚪 Logout", use_container_width=True):
+            # Queued edits (TASK_DURABILITY batched/async) are written before the session goes
+            try:
+                st.session_state["task_repo"].flush()
+            except Exception as e:
+                st.error(f"Error saving tasks: {e}")
             st.session_state["logged_in"] = False
             st.session_state["current_user"] = None
             st.session_state["tasks"] = pd.DataFrame()
+            st.session_state.pop("task_repo", None)
+            st.session_state.pop("task_revision", None)
             st.rerun()
-    
-    # ------------------- Enhanced Tabs -------------------
-    tab1, tab2, tab3 = st.tabs(["📋 Kanban Board", "📊 Analytics Dashboard", "📈 Performance Insights"])
 
 # ------------------- Enhanced Task Board -------------------
 status_order = ["To Do", "In Progress", "Done"]
 status_colors = {"To Do": "#3498db", "In Progress": "#f39c12", "Done": "#27ae60"}
 status_emojis = {"To Do": "📝", "In Progress": "⏳", "Done": "✅"}
 
-with tab1:
+def render_task_card(row):
+    # One card plus its edit controls, for a row of build_board_view()
+    est_hours = row["est_hours"]
+    st.markdown(row["card_html"], unsafe_allow_html=True)
+
+    # Controls are only built for the card being edited
+    if st.session_state.get("board_editing") != row["id"]:
+        if st.button("⚙️ Edit", key=f"edit_{row['id']}", help="Change status, hours or delete"):
+            st.session_state["board_editing"] = row["id"]
+            rerun_fragment()
+    else:
+        col1, col2, col3, col4 = st.columns([2, 1, 1, 1])
+        with col1:
+            current_status = row["status"] if row["status"] in status_order else "To Do"
+            new_status = st.selectbox(
+                "Status",
+                options=status_order,
+                index=status_order.index(current_status),
+                key=f"status_{row['id']}",
+                label_visibility="collapsed"
+            )
+            if new_status != current_status:
+                changes = {"status": new_status}
+                if new_status == "Done":
+                    changes["completed_at"] = datetime.now().isoformat()
+                    # Auto-set actual hours to estimated if not already set
+                    if pd.isna(row['actual_hours']) or row['actual_hours'] == 0:
+                        changes["actual_hours"] = est_hours
+                update_task(row["id"], **changes)
+                rerun_fragment()
+
+        with col2:
+            if row["status"] == "Done":
+                actual_hours = st.number_input(
+                    "Actual Hours",
+                    min_value=0.1,
+                    max_value=50.0,
+                    value=float(row['actual_hours']) if pd.notna(row['actual_hours']) and row['actual_hours'] > 0 else est_hours,
+                    step=0.1,
+                    key=f"hours_{row['id']}",
+                    label_visibility="collapsed"
+                )
+                # The input already shows the new value and the card itself does not, so no rerun is needed
+                if actual_hours != row['actual_hours']:
+                    update_task(row["id"], actual_hours=actual_hours)
+
+        with col3:
+            if st.button("🗑️", key=f"del_{row['id']}", help="Delete task"):
+                delete_task(row["id"])
+                st.success("🗑️ Task deleted")
+                rerun_fragment()
+
+        with col4:
+            if st.button("✖️", key=f"close_{row['id']}", help="Close controls"):
+                st.session_state["board_editing"] = None
+                rerun_fragment()
+
+    st.markdown("---")
+
+def reset_search_page():
+    st.session_state["search_page"] = 0
+
+def render_search_results(matches, page_size):
+    # Only the current page of matches is rendered, best match first
+    if matches.empty:
+        st.info("🔎 No tasks match your search.")
+        return
+    pages = -(-len(matches) // page_size)
+    page = min(st.session_state.get("search_page", 0), pages - 1)
+    shown = matches.iloc[page * page_size:(page + 1) * page_size]
+    st.caption(f"Results {page * page_size + 1}-{page * page_size + len(shown)} of {len(matches)}")
+    for row in build_board_view(shown).to_dict("records"):
+        try:
+            st.caption(f"{status_emojis.get(row['status'], '')} {row['status']}")
+            render_task_card(row)
+        except Exception as e:
+            st.error(f"Error displaying task: {e}")
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col1:
+        if st.button("⬅️ Previous", key="search_prev", disabled=page == 0, use_container_width=True):
+            st.session_state["search_page"] = page - 1
+            rerun_fragment()
+    with col2:
+        st.caption(f"Page {page + 1} of {pages}")
+    with col3:
+        if st.button("Next ➡️", key="search_next", disabled=page >= pages - 1, use_container_width=True):
+            st.session_state["search_page"] = page + 1
+            rerun_fragment()
+
+# The board reruns as a fragment: card edits, filters and paging redraw the
+# columns (counts and cross-column moves included) without re-running the
+# page setup, sidebar or other views. Sidebar stats catch up on the next full rerun.
+@fragment
+@timed("render_board")
+def render_board():
     try:
         df = st.session_state["tasks"]
         if df.empty:
@@ -434,11 +658,66 @@ with tab1:
             </div>
             """, unsafe_allow_html=True)
         else:
+            # Search runs on the user's inverted index; while it is set only matching cards are rendered
+            query = st.text_input("🔎 Search", key="board_search", on_change=reset_search_page,
+                                  placeholder="Search task titles and categories...").strip()
+            # Board filters and paging
+            col1, col2, col3, col4 = st.columns([2, 2, 2, 1])
+            with col1:
+                tag_filter = st.multiselect("🏷️ Category", sorted(df["tag"].dropna().astype(str).unique()), key="board_tags")
+            with col2:
+                priority_filter = st.multiselect("🎯 Priority", [1,2,3,4,5], key="board_priorities",
+                                                 format_func=lambda x: f"🔴 Critical" if x==1 else f"🟡 High" if x==2 else f"🟢 Medium" if x==3 else f"🔵 Low" if x==4 else "⚫ Minimal")
+            with col3:
+                due_window = st.selectbox("📅 Due", list(DUE_WINDOWS), key="board_due_window")
+            with col4:
+                page_size = st.selectbox("📄 Per column", BOARD_PAGE_SIZES, key="board_page_size")
+            with stage("board_filter"):
+                tasks_shown = st.session_state["task_repo"].search(query) if query else df
+                filtered = filter_board_tasks(tasks_shown, tag_filter, priority_filter, due_window)
+                instrumentation.count(rows=len(filtered))
+
+            # A toggle, not an expander: collapsed expanders still ship their widgets, and the
+            # task multiselect carries up to BULK_SELECT_LIMIT titles on every board rerun
+            if st.toggle("🧰 Bulk actions", key="bulk_mode"):
+                select_all = st.checkbox(f"All {len(filtered)} tasks matching the filters", key="bulk_all")
+                if select_all:
+                    selected = filtered
+                else:
+                    # A multiselect over tens of thousands of options is unusable; filter first or use "All"
+                    options = filtered.head(BULK_SELECT_LIMIT)
+                    titles = dict(zip(options["id"].tolist(), options["title"].astype(str) + " · " + options["status"].astype(str)))
+                    chosen = st.multiselect("Tasks", list(titles), format_func=titles.get, key="bulk_ids")
+                    selected = filtered[filtered["id"].isin(chosen)]
+                col1, col2 = st.columns([2, 1])
+                with col1:
+                    action = st.selectbox("Action", BULK_ACTIONS, key="bulk_action", label_visibility="collapsed")
+                with col2:
+                    apply = st.button(f"Apply to {len(selected)}", key="bulk_apply", disabled=selected.empty, use_container_width=True)
+                if apply:
+                    if action == "🗑️ Delete":
+                        bulk_delete(selected["id"].tolist())
+                    else:
+                        targets = bulk_targets(action, selected)
+                        if not targets.empty:
+                            bulk_update(targets["id"].tolist(), **bulk_fields(action, targets))
+                    st.session_state.pop("bulk_ids", None)
+                    rerun_fragment()
+
+            if query:
+                with stage("board_cards", rows=min(len(filtered), page_size)):
+                    render_search_results(filtered, page_size)
+                return
+
             # Task board columns
+            with stage("board_columns", rows=len(filtered)):
+                board_columns = split_columns(filtered, status_order)
             cols = st.columns(len(status_order))
             for idx, status in enumerate(status_order):
-                with cols[idx]:
-                    tasks_count = len(df[df["status"] == status])
+                with cols[idx], stage("board_cards"):
+                    pages = st.session_state.get(f"board_pages_{status}", 1)
+                    tasks, tasks_count = column_page(board_columns, status, pages * page_size)
+                    instrumentation.count(rows=len(tasks))
                     st.markdown(f"""
                     <div style="background: {status_colors[status]}; color: white; padding: 1rem; border-radius: 10px; text-align: center; margin-bottom: 1rem;">
                         <h4 style="margin:0; font-size:1.1rem;">{status_emojis[status]} {status}</h4>
@@ -446,122 +725,58 @@ with tab1:
                     </div>
                     """, unsafe_allow_html=True)
                     
-                    tasks = df[df["status"] == status].sort_values("priority")
-                    for _, row in tasks.iterrows():
+                    for row in build_board_view(tasks).to_dict("records"):
                         try:
-                            # Status-based styling with priority accents
-                            if status == "To Do":
-                                status_class = "priority-high" if row['priority'] <= 2 else "priority-medium" if row['priority'] <= 3 else "priority-low"
-                                text_color = "#2c3e50"
-                            elif status == "In Progress":
-                                status_class = "task-in-progress"
-                                text_color = "white"
-                            else:  # Done
-                                status_class = "task-done"
-                                text_color = "white"
-                            
-                            priority_emoji = "🔴" if row['priority'] == 1 else "🟡" if row['priority'] == 2 else "🟢" if row['priority'] == 3 else "🔵" if row['priority'] == 4 else "⚫"
-                            
-                            task_tag = row['tag'] if pd.notna(row['tag']) and row['tag'] else 'General'
-                            task_due = row['due_date'] if pd.notna(row['due_date']) else 'No date'
-                            est_hours = row['estimated_hours'] if pd.notna(row['estimated_hours']) else 0
-                            
-                            # Days until due
-                            try:
-                                due_date_obj = datetime.strptime(task_due, '%Y-%m-%d').date()
-                                days_left = (due_date_obj - datetime.now().date()).days
-                                urgency_color = "#e74c3c" if days_left < 0 else "#f39c12" if days_left < 3 else "#27ae60"
-                                urgency_text = f"⚠️ {abs(days_left)} days overdue" if days_left < 0 else f"🔥 {days_left} days left" if days_left < 3 else f"📅 {days_left} days left"
-                            except:
-                                urgency_color = "#95a5a6"
-                                urgency_text = "📅 No due date"
-                            
-                            st.markdown(f"""
-                            <div class="task-card {status_class}">
-                                <h4 style="margin: 0; color: {text_color};">{row['title']}</h4>
-                                <div style="margin: 0.5rem 0;">
-                                    <span style="background: #34495e; color: white; padding: 0.2rem 0.5rem; border-radius: 15px; font-size: 0.8rem; margin-right: 0.5rem;">
-                                        {priority_emoji} P{row['priority']}
-                                    </span>
-                                    <span style="background: #3498db; color: white; padding: 0.2rem 0.5rem; border-radius: 15px; font-size: 0.8rem; margin-right: 0.5rem;">
-                                        🏷️ {task_tag}
-                                    </span>
-                                    <span style="background: #9b59b6; color: white; padding: 0.2rem 0.5rem; border-radius: 15px; font-size: 0.8rem;">
-                                        ⏱️ {est_hours}h
-                                    </span>
-                                </div>
-                                <div style="color: {urgency_color}; font-weight: 600; font-size: 0.9rem;">
-                                    {urgency_text}
-                                </div>
-                            </div>
-                            """, unsafe_allow_html=True)
-                            
-                            # Enhanced controls
-                            col1, col2, col3 = st.columns([2, 1, 1])
-                            with col1:
-                                current_status = row["status"] if row["status"] in status_order else "To Do"
-                                new_status = st.selectbox(
-                                    "Status",
-                                    options=status_order,
-                                    index=status_order.index(current_status),
-                                    key=f"status_{row['id']}",
-                                    label_visibility="collapsed"
-                                )
-                                if new_status != current_status:
-                                    st.session_state["tasks"].loc[df["id"]==row["id"], "status"] = new_status
-                                    if new_status == "Done":
-                                        st.session_state["tasks"].loc[df["id"]==row["id"], "completed_at"] = datetime.now().isoformat()
-                                        # Auto-set actual hours to estimated if not already set
-                                        if pd.isna(row['actual_hours']) or row['actual_hours'] == 0:
-                                            st.session_state["tasks"].loc[df["id"]==row["id"], "actual_hours"] = est_hours
-                                    save_tasks()
-                                    st.rerun()
-                            
-                            with col2:
-                                if row["status"] == "Done":
-                                    actual_hours = st.number_input(
-                                        "Actual Hours",
-                                        min_value=0.1,
-                                        max_value=50.0,
-                                        value=float(row['actual_hours']) if pd.notna(row['actual_hours']) and row['actual_hours'] > 0 else est_hours,
-                                        step=0.1,
-                                        key=f"hours_{row['id']}",
-                                        label_visibility="collapsed"
-                                    )
-                                    if actual_hours != row['actual_hours']:
-                                        st.session_state["tasks"].loc[df["id"]==row["id"], "actual_hours"] = actual_hours
-                                        save_tasks()
-                                        st.rerun()
-                            
-                            with col3:
-                                if st.button("🗑️", key=f"del_{row['id']}", help="Delete task"):
-                                    st.session_state["tasks"] = df[df["id"] != row["id"]].reset_index(drop=True)
-                                    save_tasks()
-                                    st.success("🗑️ Task deleted")
-                                    st.rerun()
-                                    
-                            st.markdown("---")
-                            
+                            render_task_card(row)
                         except Exception as e:
                             st.error(f"Error displaying task: {e}")
+                    
+                    if tasks_count > len(tasks):
+                        st.caption(f"Showing {len(tasks)} of {tasks_count}")
+                        if st.button("⬇️ Load more", key=f"more_{status}", use_container_width=True):
+                            st.session_state[f"board_pages_{status}"] = pages + 1
+                            rerun_fragment()
     except Exception as e:
         st.error(f"Error in task board: {e}")
 
 # ------------------- Enhanced Analytics -------------------
-with tab2:
+def date_range_selector():
+    # Analytics and Insights only look at tasks created or completed in this range
+    today = datetime.now().date()
+    st.session_state.setdefault("analytics_custom_range_kept", (today - timedelta(days=29), today))
+    # Widget state is dropped while the board (no selector) is shown; bring back the last choice
+    for key in ["analytics_window", "analytics_custom_range"]:
+        if key not in st.session_state and f"{key}_kept" in st.session_state:
+            st.session_state[key] = st.session_state[f"{key}_kept"]
+    col1, col2 = st.columns([1, 2])
+    with col1:
+        choice = st.selectbox("📅 Date range", list(ANALYTICS_WINDOWS), key="analytics_window")
+    st.session_state["analytics_window_kept"] = choice
+    custom = None
+    if choice == "Custom":
+        with col2:
+            custom = st.date_input("Custom range", key="analytics_custom_range")
+        st.session_state["analytics_custom_range_kept"] = custom
+    st.session_state["analytics_range"] = window_bounds(choice, custom=custom)
+
+@timed("render_analytics")
+def render_analytics():
     try:
-        df = st.session_state["tasks"]
-        if df.empty:
+        df, dataset_key = analytics_tasks()
+        if st.session_state["tasks"].empty:
             st.info("📊 Create some tasks to see powerful analytics in action!")
+        elif df.empty:
+            st.info("📅 No tasks were created or completed in this date range.")
         else:
             # Key Metrics Row
             col1, col2, col3, col4, col5 = st.columns(5)
             
-            total_tasks = len(df)
-            completed_tasks = len(df[df["status"]=="Done"])
-            in_progress = len(df[df["status"]=="In Progress"])
-            completion_rate = (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0
-            avg_priority = df["priority"].mean() if not df.empty else 0
+            metrics = get_task_metrics(df, dataset_key)
+            total_tasks = metrics.total
+            completed_tasks = metrics.done
+            in_progress = metrics.in_progress
+            completion_rate = metrics.completion_rate
+            avg_priority = metrics.avg_priority
             
             with col1:
                 st.markdown(f"""
@@ -617,15 +832,7 @@ with tab2:
                 st.markdown('<div class="analytics-card">', unsafe_allow_html=True)
                 st.subheader("📊 Task Distribution by Status")
                 
-                status_counts = df["status"].value_counts()
-                fig_pie = px.pie(
-                    values=status_counts.values,
-                    names=status_counts.index,
-                    color_discrete_map=status_colors,
-                    title="Task Status Distribution"
-                )
-                fig_pie.update_traces(textposition='inside', textinfo='percent+label')
-                fig_pie.update_layout(height=400, showlegend=True)
+                fig_pie = cached_figure(dataset_key, "status_pie", lambda: status_pie(metrics), inputs=chart_inputs(metrics.status_counts))
                 st.plotly_chart(fig_pie, use_container_width=True)
                 st.markdown('</div>', unsafe_allow_html=True)
             
@@ -633,17 +840,7 @@ with tab2:
                 st.markdown('<div class="analytics-card">', unsafe_allow_html=True)
                 st.subheader("🎯 Priority Analysis")
                 
-                priority_counts = df["priority"].value_counts().sort_index()
-                priority_labels = {1: "Critical", 2: "High", 3: "Medium", 4: "Low", 5: "Minimal"}
-                
-                fig_bar = px.bar(
-                    x=[priority_labels[p] for p in priority_counts.index],
-                    y=priority_counts.values,
-                    color=priority_counts.values,
-                    color_continuous_scale="RdYlGn_r",
-                    title="Tasks by Priority Level"
-                )
-                fig_bar.update_layout(height=400, xaxis_title="Priority", yaxis_title="Number of Tasks")
+                fig_bar = cached_figure(dataset_key, "priority_bar", lambda: priority_bar(metrics), inputs=chart_inputs(metrics.priority_counts))
                 st.plotly_chart(fig_bar, use_container_width=True)
                 st.markdown('</div>', unsafe_allow_html=True)
             
@@ -654,15 +851,7 @@ with tab2:
                 st.markdown('<div class="analytics-card">', unsafe_allow_html=True)
                 st.subheader("🏷️ Category Breakdown")
                 
-                category_counts = df["tag"].value_counts()
-                fig_donut = px.pie(
-                    values=category_counts.values,
-                    names=category_counts.index,
-                    title="Tasks by Category",
-                    hole=0.4
-                )
-                fig_donut.update_traces(textposition='inside', textinfo='percent+label')
-                fig_donut.update_layout(height=400)
+                fig_donut = cached_figure(dataset_key, "category_donut", lambda: category_donut(metrics), inputs=chart_inputs(metrics.tag_counts))
                 st.plotly_chart(fig_donut, use_container_width=True)
                 st.markdown('</div>', unsafe_allow_html=True)
             
@@ -671,22 +860,9 @@ with tab2:
                 st.subheader("📈 Completion Trend")
                 
                 try:
-                    df_copy = df.copy()
-                    df_copy["completed_at"] = pd.to_datetime(df_copy["completed_at"], errors="coerce")
-                    df_completed = df_copy.dropna(subset=["completed_at"])
-                    
-                    if not df_completed.empty:
-                        df_completed['completion_date'] = df_completed["completed_at"].dt.date
-                        daily_completions = df_completed.groupby('completion_date').size().reset_index(name='completed_tasks')
-                        
-                        fig_line = px.line(
-                            daily_completions,
-                            x='completion_date',
-                            y='completed_tasks',
-                            title='Daily Task Completions',
-                            markers=True
-                        )
-                        fig_line.update_layout(height=400, xaxis_title="Date", yaxis_title="Tasks Completed")
+                    daily = completion_rollups().daily()
+                    fig_line = cached_figure(dataset_key, "completion_trend", lambda: completion_trend(daily), inputs=chart_inputs(daily))
+                    if fig_line is not None:
                         st.plotly_chart(fig_line, use_container_width=True)
                     else:
                         st.info("Complete some tasks to see the trend!")
@@ -699,63 +875,30 @@ with tab2:
         st.error(f"Error in analytics: {e}")
 
 # ------------------- Performance Insights -------------------
-with tab3:
+@timed("render_insights")
+def render_insights():
     try:
-        df = st.session_state["tasks"]
-        if df.empty:
+        df, dataset_key = analytics_tasks()
+        if st.session_state["tasks"].empty:
             st.info("📈 Complete some tasks to unlock performance insights!")
+        elif df.empty:
+            st.info("📅 No tasks were created or completed in this date range.")
         else:
             st.subheader("🎯 Performance Dashboard")
+            metrics = get_task_metrics(df, dataset_key)
             
             # Time management analysis
-            completed_df = df[df["status"] == "Done"].copy()
-            
-            if not completed_df.empty:
+            if metrics.done > 0:
                 # Time estimation accuracy
-                completed_df["estimated_hours"] = pd.to_numeric(completed_df["estimated_hours"], errors="coerce").fillna(0)
-                completed_df["actual_hours"] = pd.to_numeric(completed_df["actual_hours"], errors="coerce").fillna(0)
-                
-                valid_time_data = completed_df[(completed_df["estimated_hours"] > 0) & (completed_df["actual_hours"] > 0)]
-                
-                if not valid_time_data.empty:
+                if not metrics.accuracy.empty:
                     col1, col2 = st.columns(2)
                     
                     with col1:
                         st.markdown('<div class="analytics-card">', unsafe_allow_html=True)
                         st.subheader("⏱️ Time Estimation Accuracy")
                         
-                        accuracy_data = []
-                        for _, row in valid_time_data.iterrows():
-                            accuracy = (min(row["estimated_hours"], row["actual_hours"]) / max(row["estimated_hours"], row["actual_hours"])) * 100
-                            accuracy_data.append({
-                                "Task": row["title"][:20] + "..." if len(row["title"]) > 20 else row["title"],
-                                "Estimated": row["estimated_hours"],
-                                "Actual": row["actual_hours"],
-                                "Accuracy": accuracy
-                            })
-                        
-                        if accuracy_data:
-                            accuracy_df = pd.DataFrame(accuracy_data)
-                            avg_accuracy = accuracy_df["Accuracy"].mean()
-                            
-                            fig_accuracy = px.scatter(
-                                accuracy_df,
-                                x="Estimated",
-                                y="Actual",
-                                hover_data=["Task", "Accuracy"],
-                                title=f"Estimation vs Actual Time (Avg Accuracy: {avg_accuracy:.1f}%)",
-                                color="Accuracy",
-                                color_continuous_scale="RdYlGn"
-                            )
-                            # Add perfect estimation line
-                            max_hours = max(accuracy_df["Estimated"].max(), accuracy_df["Actual"].max())
-                            fig_accuracy.add_shape(
-                                type="line",
-                                x0=0, y0=0, x1=max_hours, y1=max_hours,
-                                line=dict(color="gray", dash="dash"),
-                            )
-                            fig_accuracy.update_layout(height=400)
-                            st.plotly_chart(fig_accuracy, use_container_width=True)
+                        fig_accuracy = cached_figure(dataset_key, "accuracy_scatter", lambda: accuracy_scatter(metrics))
+                        st.plotly_chart(fig_accuracy, use_container_width=True)
                         
                         st.markdown('</div>', unsafe_allow_html=True)
                     
@@ -763,35 +906,7 @@ with tab3:
                         st.markdown('<div class="analytics-card">', unsafe_allow_html=True)
                         st.subheader("📊 Productivity Metrics")
                         
-                        # Calculate productivity metrics
-                        total_estimated = valid_time_data["estimated_hours"].sum()
-                        total_actual = valid_time_data["actual_hours"].sum()
-                        efficiency = (total_estimated / total_actual * 100) if total_actual > 0 else 100
-                        
-                        # Create gauge chart for efficiency
-                        fig_gauge = go.Figure(go.Indicator(
-                            mode = "gauge+number+delta",
-                            value = efficiency,
-                            domain = {'x': [0, 1], 'y': [0, 1]},
-                            title = {'text': "Time Efficiency %"},
-                            delta = {'reference': 100},
-                            gauge = {
-                                'axis': {'range': [None, 150]},
-                                'bar': {'color': "darkblue"},
-                                'steps': [
-                                    {'range': [0, 50], 'color': "lightgray"},
-                                    {'range': [50, 80], 'color': "yellow"},
-                                    {'range': [80, 100], 'color': "lightgreen"},
-                                    {'range': [100, 150], 'color': "green"}
-                                ],
-                                'threshold': {
-                                    'line': {'color': "red", 'width': 4},
-                                    'thickness': 0.75,
-                                    'value': 100
-                                }
-                            }
-                        ))
-                        fig_gauge.update_layout(height=400)
+                        fig_gauge = cached_figure(dataset_key, "efficiency_gauge", lambda: efficiency_gauge(metrics), inputs=metrics.time_efficiency)
                         st.plotly_chart(fig_gauge, use_container_width=True)
                         st.markdown('</div>', unsafe_allow_html=True)
                 
@@ -800,25 +915,9 @@ with tab3:
                 st.subheader("📅 Weekly Performance Pattern")
                 
                 try:
-                    completed_df["completed_at"] = pd.to_datetime(completed_df["completed_at"], errors="coerce")
-                    if not completed_df.empty:
-                        completed_df["weekday"] = completed_df["completed_at"].dt.day_name()
-                        completed_df["hour"] = completed_df["completed_at"].dt.hour
-                        
-                        # Weekday analysis
-                        weekday_counts = completed_df["weekday"].value_counts()
-                        weekday_order = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
-                        weekday_counts = weekday_counts.reindex(weekday_order, fill_value=0)
-                        
-                        fig_weekday = px.bar(
-                            x=weekday_counts.index,
-                            y=weekday_counts.values,
-                            title="Tasks Completed by Day of Week",
-                            color=weekday_counts.values,
-                            color_continuous_scale="viridis"
-                        )
-                        fig_weekday.update_layout(xaxis_title="Day", yaxis_title="Tasks Completed")
-                        st.plotly_chart(fig_weekday, use_container_width=True)
+                    weekday_counts = completion_rollups().by_weekday()
+                    fig_weekday = cached_figure(dataset_key, "weekday_bar", lambda: weekday_bar(weekday_counts), inputs=chart_inputs(weekday_counts))
+                    st.plotly_chart(fig_weekday, use_container_width=True)
                 except Exception as e:
                     st.info("Complete more tasks to see weekly patterns!")
                 
@@ -834,6 +933,7 @@ with tab3:
             insights = []
             
             # Completion rate insight
+            completion_rate = metrics.completion_rate
             if completion_rate > 80:
                 insights.append("🎯 **Excellent completion rate!** You demonstrate strong follow-through on commitments.")
             elif completion_rate > 60:
@@ -842,8 +942,8 @@ with tab3:
                 insights.append("🔍 **Opportunity for improvement** in task completion rates.")
             
             # Priority management insight
-            high_priority_completed = len(df[(df["priority"] <= 2) & (df["status"] == "Done")])
-            high_priority_total = len(df[df["priority"] <= 2])
+            high_priority_completed = metrics.high_priority_done
+            high_priority_total = metrics.high_priority_total
             if high_priority_total > 0:
                 high_priority_rate = high_priority_completed / high_priority_total * 100
                 if high_priority_rate > 80:
@@ -853,13 +953,12 @@ with tab3:
             
             # Category analysis insight
             if not df.empty:
-                most_common_category = df["tag"].mode().iloc[0] if not df["tag"].mode().empty else "General"
+                most_common_category = metrics.most_common_tag
                 insights.append(f"📊 **Primary focus area:** {most_common_category} - shows specialization depth.")
             
             # Time management insight
-            if not completed_df.empty and not valid_time_data.empty:
-                avg_efficiency = valid_time_data.apply(lambda row: min(row["estimated_hours"], row["actual_hours"]) / max(row["estimated_hours"], row["actual_hours"]) * 100, axis=1).mean()
-                if avg_efficiency > 80:
+            if metrics.avg_accuracy is not None:
+                if metrics.avg_accuracy > 80:
                     insights.append("⏱️ **Excellent time estimation skills** - crucial for project planning.")
                 else:
                     insights.append("📊 **Developing time estimation abilities** - valuable analytical skill.")
@@ -874,19 +973,15 @@ with tab3:
             with col1:
                 st.download_button(
                     label="📥 Download Full Dataset",
-                    data=df.to_csv(index=False),
+                    data=storage_frame(st.session_state["tasks"]).to_csv(index=False),
                     file_name=f"task_analytics_{st.session_state['current_user']}_{datetime.now().strftime('%Y%m%d')}.csv",
                     mime="text/csv",
                     use_container_width=True
                 )
             
             with col2:
-                if not completed_df.empty:
-                    completed_summary = completed_df.groupby("tag").agg({
-                        "id": "count",
-                        "estimated_hours": "sum",
-                        "actual_hours": "sum"
-                    }).rename(columns={"id": "completed_tasks"})
+                if metrics.done > 0:
+                    completed_summary = metrics.completed_by_tag
                     
                     st.download_button(
                         label="📊 Download Summary Report",
@@ -901,11 +996,11 @@ with tab3:
                 performance_data = {
                     "Metric": ["Total Tasks", "Completion Rate", "Avg Priority", "Categories Used", "Avg Estimation Accuracy"],
                     "Value": [
-                        total_tasks,
-                        f"{completion_rate:.1f}%",
-                        f"{avg_priority:.1f}",
-                        df["tag"].nunique(),
-                        f"{avg_efficiency:.1f}%" if not completed_df.empty and not valid_time_data.empty else "N/A"
+                        metrics.total,
+                        f"{metrics.completion_rate:.1f}%",
+                        f"{metrics.avg_priority:.1f}",
+                        metrics.categories_used,
+                        f"{metrics.avg_accuracy:.1f}%" if metrics.avg_accuracy is not None else "N/A"
                     ]
                 }
                 performance_df = pd.DataFrame(performance_data)
@@ -921,6 +1016,48 @@ with tab3:
     except Exception as e:
         st.error(f"Error in performance insights: {e}")
 
+# ------------------- Views -------------------
+# In lazy mode only the selected view runs, so board edits never pay for chart builds.
+# "tabs" keeps the original st.tabs layout, where every view renders on every rerun.
+VIEWS = {
+    "📋 Kanban Board": render_board,
+    "📊 Analytics Dashboard": render_analytics,
+    "📈 Performance Insights": render_insights,
+}
+
+with main_col:
+    if VIEW_MODE == "tabs":
+        date_range_selector()
+        for tab, render in zip(st.tabs(list(VIEWS)), VIEWS.values()):
+            with tab:
+                render()
+    else:
+        active_view = st.radio("View", list(VIEWS), horizontal=True, key="active_view", label_visibility="collapsed")
+        if VIEWS[active_view] is not render_board:
+            date_range_selector()
+        VIEWS[active_view]()
+
+# ------------------- Timing Panel -------------------
+# Stage timings of this session's recent runs and the slowest users process-wide,
+# for admins (ADMIN_USERS) or everyone with DEBUG_PANEL=on.
+remember_run(instrumentation.end_run())
+if instrumentation.INSTRUMENTATION and (DEBUG_PANEL or st.session_state["current_user"].lower() in ADMIN_USERS):
+    with st.sidebar.expander("🛠️ Debug: rerun timings"):
+        runs = list(st.session_state.get("timing_runs", []))
+        if runs:
+            last = runs[-1]
+            st.caption(f"Last {last.kind}: {last.ms:.1f} ms")
+            stages = pd.DataFrame(last.stages, columns=["stage", "depth", "ms", "rows", "bytes_read", "bytes_written"])
+            stages["stage"] = ["· " * depth + name for name, depth in zip(stages["stage"], stages["depth"])]
+            st.dataframe(stages.drop(columns="depth"), hide_index=True, use_container_width=True)
+            st.caption("Recent runs (ms): " + ", ".join(f"{r.kind} {r.ms:.0f}" for r in reversed(runs)))
+        slowest = instrumentation.registry.slowest_users()
+        if slowest:
+            st.dataframe(pd.DataFrame(slowest, columns=["user", "kind", "runs", "mean ms", "max ms"]).round(1),
+                         hide_index=True, use_container_width=True)
+        st.download_button("📥 Prometheus metrics", data=instrumentation.registry.prometheus_text(),
+                           file_name="todo_metrics.prom", mime="text/plain", use_container_width=True)
+
 # ------------------- Footer -------------------
 st.markdown("---")
 st.markdown("""
@@ -0,0 +1,63 @@
+# Estimation accuracy in Performance Insights: the old iterrows() + apply(axis=1) passes
+# vs the single vectorized estimation_accuracy() column.
+# Run from the repository root: python -m benchmarks.bench_accuracy
+import time
+
+import pandas as pd
+
+from benchmarks.synthetic import make_tasks
+from metrics import estimation_accuracy
+
+SIZES = [10_000, 25_000, 50_000]
+
+
+def legacy_accuracy(df):
+    completed_df = df[df["status"] == "Done"].copy()
+    completed_df["estimated_hours"] = pd.to_numeric(completed_df["estimated_hours"], errors="coerce").fillna(0)
+    completed_df["actual_hours"] = pd.to_numeric(completed_df["actual_hours"], errors="coerce").fillna(0)
+    valid_time_data = completed_df[(completed_df["estimated_hours"] > 0) & (completed_df["actual_hours"] > 0)]
+    accuracy_data = []
+    for _, row in valid_time_data.iterrows():
+        accuracy = (min(row["estimated_hours"], row["actual_hours"]) / max(row["estimated_hours"], row["actual_hours"])) * 100
+        accuracy_data.append({
+            "Task": row["title"][:20] + "..." if len(row["title"]) > 20 else row["title"],
+            "Estimated": row["estimated_hours"],
+            "Actual": row["actual_hours"],
+            "Accuracy": accuracy
+        })
+    accuracy_df = pd.DataFrame(accuracy_data)
+    avg_efficiency = valid_time_data.apply(lambda row: min(row["estimated_hours"], row["actual_hours"]) / max(row["estimated_hours"], row["actual_hours"]) * 100, axis=1).mean()
+    return accuracy_df, avg_efficiency
+
+
+def vectorized_accuracy(df):
+    accuracy_df = estimation_accuracy(df)
+    return accuracy_df, accuracy_df["Accuracy"].mean()
+
+
+def best_of(fn, repeat=3):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    print(f"{'tasks':>8} {'completed':>10} {'legacy ms':>10} {'vectorized ms':>14} {'speedup':>8}")
+    for n in SIZES:
+        # Every task done, so the completed set is the full size
+        df = make_tasks(n).assign(status="Done")
+        df["actual_hours"] = df["estimated_hours"] * 1.25
+        legacy_df, legacy_avg = legacy_accuracy(df)
+        fast_df, fast_avg = vectorized_accuracy(df)
+        assert abs(legacy_avg - fast_avg) < 1e-9
+        pd.testing.assert_frame_equal(legacy_df, fast_df.reset_index(drop=True), check_dtype=False)
+        legacy = best_of(lambda: legacy_accuracy(df), repeat=1)
+        fast = best_of(lambda: vectorized_accuracy(df))
+        print(f"{n:>8} {len(fast_df):>10} {legacy * 1e3:>10.1f} {fast * 1e3:>14.2f} {legacy / fast:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# Per-card cost of the Kanban card preparation: the old iterrows() loop vs build_board_view().
+# Run from the repository root: python -m benchmarks.bench_board_view
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from benchmarks.synthetic import make_tasks
+from board import build_board_view, render_card
+from storage import storage_frame
+
+SIZES = [100, 1_000, 10_000]
+
+
+def legacy_cards(df):
+    # The pre-view-model loop body from app.py, minus the Streamlit calls
+    cards = []
+    for _, row in df.iterrows():
+        status = row["status"]
+        if status == "To Do":
+            status_class = "priority-high" if row['priority'] <= 2 else "priority-medium" if row['priority'] <= 3 else "priority-low"
+            text_color = "#2c3e50"
+        elif status == "In Progress":
+            status_class = "task-in-progress"
+            text_color = "white"
+        else:
+            status_class = "task-done"
+            text_color = "white"
+        priority_emoji = "🔴" if row['priority'] == 1 else "🟡" if row['priority'] == 2 else "🟢" if row['priority'] == 3 else "🔵" if row['priority'] == 4 else "⚫"
+        task_tag = row['tag'] if pd.notna(row['tag']) and row['tag'] else 'General'
+        task_due = row['due_date'] if pd.notna(row['due_date']) else 'No date'
+        est_hours = row['estimated_hours'] if pd.notna(row['estimated_hours']) else 0
+        try:
+            due_date_obj = datetime.strptime(task_due, '%Y-%m-%d').date()
+            days_left = (due_date_obj - datetime.now().date()).days
+            urgency_color = "#e74c3c" if days_left < 0 else "#f39c12" if days_left < 3 else "#27ae60"
+            urgency_text = f"⚠️ {abs(days_left)} days overdue" if days_left < 0 else f"🔥 {days_left} days left" if days_left < 3 else f"📅 {days_left} days left"
+        except:
+            urgency_color = "#95a5a6"
+            urgency_text = "📅 No due date"
+        cards.append(render_card.__wrapped__(status_class, text_color, row['title'], priority_emoji, row['priority'], task_tag, est_hours, urgency_color, urgency_text))
+    return cards
+
+
+def best_of(fn, repeat=3):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    print(f"{'tasks':>8} {'legacy us/card':>15} {'view model us/card':>19} {'cached us/card':>15} {'speedup':>8}")
+    for n in SIZES:
+        df = make_tasks(n)
+        # The old loop ran on the string-typed frame the app kept before the typed schema
+        legacy_df = storage_frame(df)
+        assert legacy_cards(legacy_df.head(50)) == list(build_board_view(df.head(50))["card_html"])
+        legacy = best_of(lambda: legacy_cards(legacy_df))
+        render_card.cache_clear()
+        cold = best_of(lambda: (render_card.cache_clear(), build_board_view(df)))
+        warm = best_of(lambda: build_board_view(df))
+        print(f"{n:>8} {legacy / n * 1e6:>15.1f} {cold / n * 1e6:>19.1f} {warm / n * 1e6:>15.1f} {legacy / cold:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+# The task form's duplicate check, per created task, as the list grows.
+# scan: the old check, lowercasing every title in the frame on each create.
+# exact / similar: DuplicateIndex lookups (the index is built once per load,
+# then kept up to date by each write; its build time is shown separately).
+# Run from the repository root: python -m benchmarks.bench_duplicates [--sizes 1000 10000 100000 1000000]
+import argparse
+import time
+
+from benchmarks.synthetic import make_tasks
+from dedupe import DuplicateIndex
+
+PROBES = ["Task 42 research", "task 4 2 reserch", "Write the quarterly report"]
+
+
+def timed(func, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    print(f"{'tasks':>8} {'scan ms':>9} {'exact ms':>9} {'similar ms':>11} {'build exact ms':>15} {'build similar ms':>17}")
+    for n in args.sizes:
+        df = make_tasks(n)
+
+        def scan():
+            for title in PROBES:
+                ((df["title"].str.lower() == title.lower()) & (df["priority"] == 3)).any()
+
+        build_exact = timed(lambda: DuplicateIndex(df), repeat=1)
+        build_similar = timed(lambda: DuplicateIndex(df, similar=True), repeat=1)
+        exact, similar = DuplicateIndex(df), DuplicateIndex(df, similar=True)
+        per_probe = len(PROBES)
+        print(f"{n:>8} {timed(scan) / per_probe:>9.3f} "
+              f"{timed(lambda: [exact.find(t, 3) for t in PROBES]) / per_probe:>9.4f} "
+              f"{timed(lambda: [similar.find(t, 3) for t in PROBES]) / per_probe:>11.3f} "
+              f"{build_exact:>15.0f} {build_similar:>17.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# Importing tasks migrated from another tool: one at a time through the task
+# form's path (duplicate scan + add_task per task) vs the bulk import
+# (one vectorized validation/dedupe pass + one write), into a user who already has tasks.
+# The one-at-a-time path is quadratic, so it runs on a sample and is extrapolated.
+# Run from the repository root: python -m benchmarks.bench_import [--tasks 50000] [--sample 2000]
+import argparse
+import os
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmarks.synthetic import make_tasks
+from bulk import prepare_import, read_import
+from repository import TaskRepository
+from storage import CsvTaskStore, SqliteTaskStore, storage_frame
+
+USER = "bench"
+EXISTING = 10_000
+
+
+def upload(n):
+    # What a user uploads: the synthetic tasks as CSV text, with 5% repeated rows
+    df = storage_frame(make_tasks(n, seed=1)).drop(columns=["id"])
+    df = df.assign(title=[f"Imported {i}" for i in range(n)])
+    repeats = df.sample(frac=0.05, random_state=1)
+    return pd.concat([df, repeats]).to_csv(index=False).encode()
+
+
+def one_at_a_time(repo, raw):
+    for task in raw.to_dict("records"):
+        df = repo.df
+        if ((df["title"].str.lower() == task["title"].lower()) & (df["priority"] == int(task["priority"]))).any():
+            continue
+        repo.add_task(dict(task, id=int(df["id"].max()) + 1))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, default=50_000)
+    parser.add_argument("--sample", type=int, default=2_000)
+    args = parser.parse_args()
+
+    data = upload(args.tasks)
+    cwd = os.getcwd()
+    print(f"{args.tasks} tasks uploaded ({len(data) / 2**20:.1f} MB CSV) into a user with {EXISTING} tasks")
+    for make_store in [lambda: SqliteTaskStore("tasks.db"), CsvTaskStore]:
+        with tempfile.TemporaryDirectory() as workdir:
+            os.chdir(workdir)
+            store = make_store()
+            store.init_user(USER)
+            store.save(USER, make_tasks(EXISTING))
+
+            repo = TaskRepository(USER, store)
+            sample = read_import("upload.csv", data).head(args.sample)
+            start = time.perf_counter()
+            one_at_a_time(repo, sample)
+            per_task = (time.perf_counter() - start) / args.sample
+
+            store.save(USER, make_tasks(EXISTING))
+            repo = TaskRepository(USER, store)
+            start = time.perf_counter()
+            tasks, report = prepare_import(read_import("upload.csv", data), repo.df)
+            prepared = time.perf_counter() - start
+            repo.add_tasks(tasks)
+            total = time.perf_counter() - start
+            assert len(TaskRepository(USER, store).df) == EXISTING + report["imported"] == EXISTING + args.tasks
+            print(f"{store.name:>7}: one at a time {per_task * 1000:.1f} ms/task on the first {args.sample} "
+                  f"(>= {per_task * args.tasks:.0f}s for all, growing with the list); "
+                  f"bulk {total:.2f}s ({prepared:.2f}s validate+dedupe, {report['duplicates']} duplicates skipped)")
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    main()
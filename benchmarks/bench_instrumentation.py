@@ -0,0 +1,52 @@
+# What the rerun timings cost: one stage() around an empty block, with
+# INSTRUMENTATION on and off, and one finished run of 20 stages.
+# Run from the repository root: python -m benchmarks.bench_instrumentation [--calls 100000]
+import argparse
+import time
+
+import instrumentation
+from instrumentation import stage
+
+
+def per_call_us(func, calls):
+    start = time.perf_counter()
+    for _ in range(calls):
+        func()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def empty():
+    pass
+
+
+def staged():
+    with stage("bench"):
+        pass
+
+
+def rerun():
+    with instrumentation.run("bench", "bench"):
+        for _ in range(20):
+            with stage("bench", rows=1):
+                instrumentation.count(bytes_read=100)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=100_000)
+    args = parser.parse_args()
+
+    baseline = per_call_us(empty, args.calls)
+    on = per_call_us(staged, args.calls)
+    instrumentation.INSTRUMENTATION = False
+    off = per_call_us(staged, args.calls)
+    instrumentation.INSTRUMENTATION = True
+    runs = per_call_us(rerun, max(args.calls // 100, 1))
+    print(f"{'empty call':>22} {baseline:>8.2f} us")
+    print(f"{'stage, on':>22} {on:>8.2f} us")
+    print(f"{'stage, off':>22} {off:>8.2f} us")
+    print(f"{'run of 20 stages':>22} {runs:>8.2f} us")
+
+
+if __name__ == "__main__":
+    main()
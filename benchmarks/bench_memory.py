@@ -0,0 +1,96 @@
+# Per-session memory of the task frame: the old all-object representation vs the typed schema.
+# Every logged-in session holds one of these frames, so the totals scale with concurrent users.
+# Also the peak memory of one Parquet load at PARQUET_TASKS tasks, for the read
+# options ParquetTaskStore could use (each in a fresh process, so peaks don't mix;
+# peaks come from /proc, so that part only runs on Linux).
+# Run from the repository root: python -m benchmarks.bench_memory
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+from benchmarks.synthetic import make_tasks
+from storage import ParquetTaskStore, memory_report, storage_frame
+
+SIZES = [1_000, 10_000, 100_000]
+PARQUET_TASKS = 1_000_000
+PARQUET_READS = {
+    "to_pandas()": ({}, {}),
+    "memory_map": ({"memory_map": True}, {}),
+    "self_destruct + split_blocks": ({}, {"self_destruct": True, "split_blocks": True}),
+}
+
+
+def legacy_frame(df):
+    # What sessions held before: string ids, dates and categories, int64 priority, float64 hours
+    legacy = storage_frame(df)
+    for col in ["priority", "estimated_hours", "actual_hours"]:
+        legacy[col] = pd.to_numeric(legacy[col])
+    return legacy
+
+
+def parquet_read(path, read_options, pandas_options):
+    # In a fresh process: (load ms, peak RSS growth MB, frame MB)
+    import pyarrow.parquet as pq
+
+    # Reset the RSS high-water mark (ru_maxrss would carry over the parent's)
+    with open("/proc/self/clear_refs", "w") as f:
+        f.write("5")
+    before = rss_peak_mb()
+    start = time.perf_counter()
+    df = pq.read_table(path, **read_options).to_pandas(**pandas_options)
+    ms = (time.perf_counter() - start) * 1000
+    return ms, rss_peak_mb() - before, memory_report(df)["total"] / 2**20
+
+
+def rss_peak_mb():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+
+
+def parquet_reads():
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        try:
+            store = ParquetTaskStore()
+            store.save("bench", make_tasks(PARQUET_TASKS))
+            path = os.path.abspath(store.user_file("bench"))
+            print(f"\nParquet load at {PARQUET_TASKS} tasks")
+            print(f"{'read':>30} {'ms':>7} {'peak MB':>8} {'frame MB':>9}")
+            context = multiprocessing.get_context("spawn")
+            for name, (read_options, pandas_options) in PARQUET_READS.items():
+                with context.Pool(1) as pool:
+                    ms, peak, frame = pool.apply(parquet_read, (path, read_options, pandas_options))
+                print(f"{name:>30} {ms:>7.0f} {peak:>8.0f} {frame:>9.0f}")
+        finally:
+            os.chdir(cwd)
+
+
+def main():
+    print(f"{'tasks':>8} {'legacy MB':>10} {'typed MB':>9} {'saved':>6}")
+    for n in SIZES:
+        typed = make_tasks(n)
+        before = memory_report(legacy_frame(typed))
+        after = memory_report(typed)
+        print(f"{n:>8} {before['total'] / 2**20:>10.2f} {after['total'] / 2**20:>9.2f} {1 - after['total'] / before['total']:>6.0%}")
+
+    print(f"\nper column at {SIZES[-1]} tasks (bytes/row)")
+    for col in after["columns"]:
+        print(f"{col:>16} {before['columns'][col] / n:>8.1f} {after['columns'][col] / n:>8.1f}")
+
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return
+    if sys.platform.startswith("linux"):
+        parquet_reads()
+
+
+if __name__ == "__main__":
+    main()
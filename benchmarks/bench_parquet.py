@@ -0,0 +1,49 @@
+# CSV vs Parquet task files: full save and full load at 10k / 100k / 1M tasks.
+# Every load starts from a cleared frame cache, i.e. a cold read from disk.
+# Run from the repository root: python -m benchmarks.bench_parquet [--sizes 10000 100000 1000000]
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.synthetic import make_tasks
+from cache import frame_cache
+from storage import CsvTaskStore, ParquetTaskStore, storage_frame
+
+USER = "bench"
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return (time.perf_counter() - start) * 1000, result
+
+
+def cold_load(store):
+    frame_cache.clear()
+    return store.load(USER)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    cwd = os.getcwd()
+    print(f"{'tasks':>8} {'format':>8} {'MB':>7} {'save ms':>9} {'load ms':>9}")
+    for n in args.sizes:
+        df = make_tasks(n)
+        with tempfile.TemporaryDirectory() as workdir:
+            os.chdir(workdir)
+            loaded = {}
+            for store in [CsvTaskStore(), ParquetTaskStore()]:
+                save_ms, _ = timed(lambda: store.save(USER, df))
+                load_ms, loaded[store.name] = timed(lambda: cold_load(store))
+                size = os.path.getsize(store.user_file(USER)) / 2**20
+                print(f"{n:>8} {store.name:>8} {size:>7.1f} {save_ms:>9.0f} {load_ms:>9.0f}")
+            assert storage_frame(loaded["csv"]).equals(storage_frame(loaded["parquet"]))
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# Board search over titles and tags, per query, as the list grows.
+# scan: case-insensitive substring match over every title and tag, the cheapest
+# way to answer it from the frame alone.
+# index: SearchIndex.search (ranked ids); rows: TaskRepository.search, the
+# ranked matching rows the board pages through.
+# Run from the repository root: python -m benchmarks.bench_search [--sizes 10000 100000]
+import argparse
+import time
+
+from benchmarks.synthetic import make_tasks
+from repository import TaskRepository
+from search import SearchIndex
+
+QUERIES = ["task 4242", "research", "rep", "data analysis", "4242 res", "no such task"]
+
+
+class MemoryStore:
+    # Just enough of a task store to hold a frame in a repository
+    def signature(self, user):
+        return None
+
+    def data_version(self, user):
+        return 0
+
+    def cache_key(self, user):
+        return ("memory", user)
+
+
+def timed(func, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    args = parser.parse_args()
+
+    print(f"{'tasks':>8} {'query':>15} {'matches':>8} {'scan ms':>8} {'index ms':>9} {'rows ms':>8}")
+    for n in args.sizes:
+        df = make_tasks(n)
+        repo = TaskRepository("bench", MemoryStore(), df=df)
+        build_ms, _ = timed(lambda: SearchIndex(df), repeat=1)
+        index = repo.search_index
+        text = (df["title"].astype(str) + " " + df["tag"].astype(str)).str.lower()
+        for query in QUERIES:
+            def scan():
+                mask = text.notna()
+                for term in query.split():
+                    mask &= text.str.contains(term, regex=False)
+                return int(mask.sum())
+
+            scan_ms, _ = timed(scan, repeat=3)
+            index_ms, ids = timed(lambda: index.search(query))
+            rows_ms, _ = timed(lambda: repo.search(query))
+            print(f"{n:>8} {query:>15} {len(ids):>8} {scan_ms:>8.1f} {index_ms:>9.2f} {rows_ms:>8.2f}")
+        print(f"{n:>8} index build {build_ms:.0f} ms (once per load)")
+
+
+if __name__ == "__main__":
+    main()
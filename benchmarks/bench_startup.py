@@ -0,0 +1,81 @@
+# Cold-start import cost of the app, per entry path, measured with python -X importtime.
+# Each path runs app.py headless in a fresh interpreter; only imports made while the
+# script runs are counted, so Streamlit's own startup is left out of every row.
+# Run from the repository root: python -m benchmarks.bench_startup
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, "app.py")
+MARKER = "--- app start ---"
+PATHS = ["login", "board", "analytics"]
+# Packages worth calling out separately when they show up on a path
+HEAVY_PACKAGES = ["pandas", "numpy", "plotly", "matplotlib", "seaborn"]
+
+
+def run_path(path):
+    # Runs in the child interpreter
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(APP, default_timeout=120)
+    if path != "login":
+        at.session_state["logged_in"] = True
+        at.session_state["current_user"] = "bench"
+        at.session_state["active_view"] = "📊 Analytics Dashboard" if path == "analytics" else "📋 Kanban Board"
+    print(MARKER, file=sys.stderr, flush=True)
+    at.run()
+    if at.exception:
+        raise SystemExit(at.exception[0].message)
+
+
+def parse_importtime(stderr):
+    # Top-level imports after the marker: {module: cumulative microseconds}
+    lines = stderr.split(MARKER, 1)[-1].splitlines()
+    top_level = {}
+    for line in lines:
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        fields = line.split("|")
+        name = fields[2][1:]
+        if name.startswith(" ") or not fields[1].strip().isdigit():
+            continue
+        top_level[name] = int(fields[1])
+    return top_level
+
+
+def measure(path, workdir):
+    env = dict(os.environ, PYTHONPATH=ROOT, USERS_FILE=os.path.join(workdir, "users.csv"),
+               TASK_DB_FILE=os.path.join(workdir, "tasks.db"))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "benchmarks.bench_startup", "--path", path],
+        cwd=workdir, env=env, capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"{path} path failed:\n{result.stderr[-2000:]}")
+    return parse_importtime(result.stderr)
+
+
+def main():
+    from benchmarks.synthetic import make_tasks
+
+    with tempfile.TemporaryDirectory() as workdir:
+        # Imported into the task store on the first logged-in run
+        make_tasks(200).to_csv(os.path.join(workdir, "tasks_bench.csv"), index=False)
+        print(f"{'path':>10} {'modules':>8} {'import ms':>10}  heavy packages (ms)")
+        for path in PATHS:
+            top_level = measure(path, workdir)
+            heavy = {
+                package: sum(us for name, us in top_level.items() if name.split(".")[0] == package)
+                for package in HEAVY_PACKAGES
+            }
+            heavy_text = ", ".join(f"{package} {us / 1e3:.0f}" for package, us in heavy.items() if us)
+            print(f"{path:>10} {len(top_level):>8} {sum(top_level.values()) / 1e3:>10.1f}  {heavy_text or '-'}")
+
+
+if __name__ == "__main__":
+    if "--path" in sys.argv:
+        run_path(sys.argv[sys.argv.index("--path") + 1])
+    else:
+        main()
@@ -0,0 +1,74 @@
+# Analytics over a date window vs the whole history, for a long-term user whose
+# tasks span a year. In memory: TimeIndex lookup + metrics on the window rows.
+# Scan: the same window as a mask over every row's created and completed time, + metrics.
+# Run from the repository root: python -m benchmarks.bench_windows [--sizes 100000 1000000]
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.synthetic import make_tasks
+import pandas as pd
+
+from metrics import TaskMetrics, window_bounds
+from repository import TaskRepository
+from storage import WINDOW_COLUMNS, SqliteTaskStore
+
+USER = "bench"
+TODAY = "2026-01-01"
+CHOICES = ["Last 7 days", "Last 30 days", "Last 90 days", "All time"]
+
+
+def timed(func, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    args = parser.parse_args()
+
+    cwd = os.getcwd()
+    print(f"{'tasks':>8} {'window':>13} {'rows':>8} {'window+metrics ms':>18} {'scan+metrics ms':>16}")
+    for n in args.sizes:
+        with tempfile.TemporaryDirectory() as workdir:
+            os.chdir(workdir)
+            store = SqliteTaskStore("tasks.db")
+            store.init_user(USER)
+            store.save(USER, make_tasks(n))
+            repo = TaskRepository(USER, store)
+            repo.window(None, None)  # builds the time index once, as the first windowed rerun does
+            for choice in CHOICES:
+                bounds = window_bounds(choice, today=TODAY)
+
+                def in_memory():
+                    df = repo.window(*bounds) if bounds else repo.df
+                    TaskMetrics(df)
+                    return len(df)
+
+                def scan():
+                    df = repo.df
+                    mask = pd.Series(False, index=df.index)
+                    for col in WINDOW_COLUMNS:
+                        inside = df[col].notna()
+                        if bounds:
+                            inside &= (df[col] >= pd.Timestamp(bounds[0])) & (df[col] < pd.Timestamp(bounds[1]))
+                        mask |= inside
+                    df = df[mask]
+                    TaskMetrics(df)
+                    return len(df)
+
+                memory_ms, rows = timed(in_memory)
+                scan_ms, scanned = timed(scan)
+                assert scanned == rows
+                print(f"{n:>8} {choice:>13} {rows:>8} {memory_ms:>18.1f} {scan_ms:>16.1f}")
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    main()
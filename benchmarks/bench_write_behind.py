@@ -0,0 +1,50 @@
+# Per-click latency of Kanban status changes under each TASK_DURABILITY mode.
+# A click is one update_task() call; in batched/async mode the store write happens
+# later, so the final flush is timed separately.
+# Run from the repository root: python -m benchmarks.bench_write_behind [--backend csv|sqlite] [--clicks N]
+import argparse
+import os
+import statistics
+import tempfile
+import time
+
+from benchmarks.synthetic import make_tasks
+from repository import DURABILITY_MODES, TaskRepository
+from storage import STATUS_ORDER, CsvTaskStore, SqliteTaskStore
+
+TASKS = 1_000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backend", choices=["csv", "sqlite"], default="sqlite")
+    parser.add_argument("--clicks", type=int, default=300)
+    args = parser.parse_args()
+
+    cwd = os.getcwd()
+    print(f"{'mode':>8} {'median ms':>10} {'p95 ms':>8} {'flush ms':>9}  ({args.clicks} clicks, {TASKS} tasks, {args.backend})")
+    for mode in DURABILITY_MODES:
+        with tempfile.TemporaryDirectory() as workdir:
+            os.chdir(workdir)
+            store = CsvTaskStore() if args.backend == "csv" else SqliteTaskStore("tasks.db")
+            store.init_user("bench")
+            store.save("bench", make_tasks(TASKS))
+            repo = TaskRepository("bench", store, durability=mode)
+            ids = repo.df["id"].tolist()
+            latencies = []
+            for i in range(args.clicks):
+                start = time.perf_counter()
+                repo.update_task(ids[i % len(ids)], status=STATUS_ORDER[i % len(STATUS_ORDER)])
+                latencies.append((time.perf_counter() - start) * 1000)
+            start = time.perf_counter()
+            repo.flush()
+            flush_ms = (time.perf_counter() - start) * 1000
+            latencies.sort()
+            p95 = latencies[int(len(latencies) * 0.95)]
+            print(f"{mode:>8} {statistics.median(latencies):>10.2f} {p95:>8.2f} {flush_ms:>9.1f}")
+            assert store.load("bench")["status"].astype(str).tolist() == repo.df["status"].astype(str).tolist()
+            os.chdir(cwd)
+
+
+if __name__ == "__main__":
+    main()
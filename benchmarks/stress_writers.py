@@ -0,0 +1,110 @@
+# Many processes writing one user's tasks (and registering users) at the same time.
+# Each writer inserts, updates and deletes its own tasks through a TaskRepository,
+# and now and then does a full save from a possibly stale copy. At the end the
+# stored data must hold exactly the tasks each writer kept, with their last
+# status, and every registration must have landed exactly once.
+# Run from the repository root: python -m benchmarks.stress_writers [--backend csv|sqlite|parquet] [--writers N] [--ops N]
+import argparse
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+
+from repository import TaskRepository
+from storage import STATUS_ORDER, CsvTaskStore, ParquetTaskStore, SqliteTaskStore, StaleWriteError
+from users import UserIndex
+
+USER = "stress"
+SAVE_EVERY = 25
+SHARED_USERNAMES = 20
+
+
+def make_store(backend):
+    # Small journal threshold, so compactions race with appends from other writers
+    if backend == "csv":
+        return CsvTaskStore(compact_every=20)
+    if backend == "parquet":
+        return ParquetTaskStore(compact_every=20)
+    return SqliteTaskStore("tasks.db")
+
+
+def writer(args):
+    backend, worker, ops, workdir = args
+    os.chdir(workdir)
+    rng = random.Random(worker)
+    repo = TaskRepository(USER, make_store(backend))
+    kept = {}
+    stale_saves = 0
+    for i in range(ops):
+        roll = rng.random()
+        if roll < 0.5 or not kept:
+            task_id = (worker + 1) * 10_000_000 + i
+            repo.add_task({
+                "id": task_id, "title": f"w{worker} task {i}", "status": "To Do", "priority": rng.randint(1, 5),
+                "tag": "Other", "due_date": "2026-01-01", "created_at": "2026-01-01T00:00:00",
+                "completed_at": "", "estimated_hours": 1.0, "actual_hours": 0,
+            })
+            kept[task_id] = "To Do"
+        elif roll < 0.85:
+            task_id = rng.choice(list(kept))
+            status = rng.choice(STATUS_ORDER)
+            repo.update_task(task_id, status=status)
+            kept[task_id] = status
+        else:
+            task_id = rng.choice(list(kept))
+            repo.delete_task(task_id)
+            del kept[task_id]
+        if i % SAVE_EVERY == SAVE_EVERY - 1:
+            try:
+                repo.save(repo.df)
+            except StaleWriteError:
+                stale_saves += 1
+
+    users = UserIndex("users.csv")
+    registered = []
+    # Half the names are contended by every writer, half are this writer's own
+    for n in range(SHARED_USERNAMES):
+        if users.add_user(f"shared{n}", "x"):
+            registered.append(f"shared{n}")
+        if users.add_user(f"w{worker}user{n}", "x"):
+            registered.append(f"w{worker}user{n}")
+    return kept, stale_saves, registered
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backend", choices=["csv", "sqlite", "parquet"], default="csv")
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--ops", type=int, default=150)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        make_store(args.backend).init_user(USER)
+        start = time.perf_counter()
+        with multiprocessing.get_context("spawn").Pool(args.writers) as pool:
+            results = pool.map(writer, [(args.backend, w, args.ops, workdir) for w in range(args.writers)])
+        elapsed = time.perf_counter() - start
+
+        expected = {}
+        for kept, _, _ in results:
+            expected.update(kept)
+        stored = TaskRepository(USER, make_store(args.backend)).df
+        actual = dict(zip(stored["id"].tolist(), stored["status"].astype(str)))
+        registrations = [name for _, _, registered in results for name in registered]
+        users = UserIndex("users.csv")
+
+        total_ops = args.writers * args.ops
+        print(f"backend {args.backend}: {args.writers} writers x {args.ops} ops in {elapsed:.1f}s ({total_ops / elapsed:.0f} ops/s)")
+        print(f"stale full saves refused: {sum(stale for _, stale, _ in results)}")
+        print(f"tasks expected {len(expected)}, stored {len(actual)}, duplicate ids {stored['id'].duplicated().sum()}")
+        print(f"registrations {len(registrations)}, unique {len(set(registrations))}, indexed {len(users)}")
+        assert actual == expected, "stored tasks differ from what the writers kept"
+        assert not stored["id"].duplicated().any()
+        assert len(registrations) == len(set(registrations)) == len(users) == SHARED_USERNAMES * (args.writers + 1)
+        print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+# The core operations at 1k to 1M tasks, timed headlessly against synthetic
+# tasks_<user>.csv / users.csv files, with the results written as JSON so two
+# commits can be compared:
+#   load      cold CSV load into the typed frame (frame cache cleared)
+#   save      full CSV rewrite (atomic, fsynced)
+#   board     one board rerun: filter, split into columns, first page of cards per column
+#   analytics TaskMetrics, completion rollups and estimation accuracy
+#   login     users.csv index build, then one password lookup (a tenth as many users as tasks)
+#   export    the "Download Full Dataset" CSV
+# Each operation reports the best of --repeat runs, in ms.
+# Run from the repository root:
+#   python -m benchmarks.suite [--sizes 1000 10000] [--output results.json] [--compare baseline.json]
+import argparse
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import make_tasks, make_users, write_dataset
+from board import build_board_view, column_page, filter_board_tasks, render_card, split_columns
+from cache import frame_cache
+from metrics import CompletionRollups, TaskMetrics, estimation_accuracy
+from storage import CsvTaskStore, storage_frame
+from users import UserIndex
+
+USER = "bench"
+STATUSES = ["To Do", "In Progress", "Done"]
+PAGE_SIZE = 10
+# A comparison flags an operation this much slower than the baseline
+REGRESSION_RATIO = 1.2
+
+
+def best_of(func, repeat, setup=None):
+    timings = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings), timings
+
+
+def board_rerun(df):
+    columns = split_columns(filter_board_tasks(df, priorities=[1, 2, 3]), STATUSES)
+    for status in STATUSES:
+        tasks, _ = column_page(columns, status, PAGE_SIZE)
+        build_board_view(tasks).to_dict("records")
+
+
+def analytics(df):
+    TaskMetrics(df)
+    CompletionRollups(df).daily()
+    estimation_accuracy(df[df["status"] == "Done"])
+
+
+def run_size(n, repeat, workdir):
+    df = make_tasks(n)
+    users = make_users(max(n // 10, 100))
+    write_dataset(workdir, df, users, user=USER)
+    store = CsvTaskStore()
+    usernames = users["username"].tolist()
+    probe = usernames[len(usernames) // 2].upper()
+
+    def login():
+        index = UserIndex(os.path.join(workdir, "users.csv"))
+        assert index.password_hash(probe) is not None
+
+    operations = {
+        "load": (lambda: store.load(USER), frame_cache.clear),
+        "save": (lambda: store.save(USER, df), None),
+        "board": (lambda: board_rerun(df), render_card.cache_clear),
+        "analytics": (lambda: analytics(df), None),
+        "login": (login, None),
+        "export": (lambda: storage_frame(df).to_csv(index=False), None),
+    }
+    results = []
+    for name, (func, setup) in operations.items():
+        ms, runs = best_of(func, repeat, setup)
+        results.append({"tasks": n, "operation": name, "ms": round(ms, 3), "runs": [round(t, 3) for t in runs]})
+        print(f"{n:>8} {name:>10} {ms:>10.1f}")
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    before = {(r["tasks"], r["operation"]): r["ms"] for r in baseline["results"]}
+    print(f"\nvs {baseline_path} ({baseline.get('commit')})")
+    print(f"{'tasks':>8} {'operation':>10} {'before ms':>10} {'after ms':>10} {'ratio':>7}")
+    slower = 0
+    for r in results:
+        old = before.get((r["tasks"], r["operation"]))
+        if old is None:
+            continue
+        ratio = r["ms"] / old if old else float("inf")
+        flag = " slower" if ratio > REGRESSION_RATIO else ""
+        slower += bool(flag)
+        print(f"{r['tasks']:>8} {r['operation']:>10} {old:>10.1f} {r['ms']:>10.1f} {ratio:>6.2f}x{flag}")
+    return slower
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--compare", help="an earlier --output file to compare against")
+    args = parser.parse_args()
+
+    cwd = os.getcwd()
+    print(f"{'tasks':>8} {'operation':>10} {'best ms':>10}")
+    results = []
+    for n in args.sizes:
+        with tempfile.TemporaryDirectory() as workdir:
+            # The stores keep tasks_<user>.csv in the working directory
+            os.chdir(workdir)
+            try:
+                results += run_size(n, args.repeat, workdir)
+            finally:
+                os.chdir(cwd)
+    report = {
+        "commit": git_commit(),
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "machine": platform.platform(),
+        "repeat": args.repeat,
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"wrote {args.output}")
+    if args.compare:
+        slower = compare(results, args.compare)
+        if slower:
+            raise SystemExit(f"{slower} operation(s) more than {REGRESSION_RATIO}x slower than the baseline")
+
+
+if __name__ == "__main__":
+    main()
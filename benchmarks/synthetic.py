@@ -0,0 +1,62 @@
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+
+from storage import ensure_columns, storage_frame
+
+STATUSES = ["To Do", "In Progress", "Done"]
+TAGS = ["Data Analysis", "Visualization", "Research", "Reporting", "Learning", "Meeting", "Other"]
+PRIORITIES = [1, 2, 3, 4, 5]
+ESTIMATES = [0.5, 1.0, 1.5, 2.0, 3.0, 4.0, 8.0]
+NOW = pd.Timestamp(2026, 1, 1, 12, 0)
+
+
+# ------------------- Synthetic Tasks -------------------
+# A year of tasks: 40% to do, 20% in progress, 40% done; priority mostly
+# medium; due dates a few days before to a month after creation; done tasks
+# completed 1-240 hours after creation, taking 0.5-2x their estimate. Drawn
+# column by column with one seeded generator, so a million tasks take seconds
+# and the same (n, seed) always gives the same frame.
+def make_tasks(n, seed=0, now=None):
+    rng = np.random.default_rng(seed)
+    now = pd.Timestamp(now) if now is not None else NOW
+    status = rng.choice(len(STATUSES), size=n, p=[0.4, 0.2, 0.4])
+    tag = rng.choice(len(TAGS), size=n)
+    title_tag = np.array([t.lower() for t in TAGS])[rng.choice(len(TAGS), size=n)]
+    created = now - pd.to_timedelta(rng.integers(0, 366, size=n), unit="D") - pd.to_timedelta(rng.integers(0, 1441, size=n), unit="min")
+    estimated = np.array(ESTIMATES)[rng.choice(len(ESTIMATES), size=n)]
+    done = status == STATUSES.index("Done")
+    df = pd.DataFrame({
+        "id": 1700000000000000 + np.arange(n, dtype="int64"),
+        "title": [f"Task {i} {t}" for i, t in enumerate(title_tag.tolist())],
+        "status": np.array(STATUSES, dtype=object)[status],
+        "priority": np.array(PRIORITIES)[rng.choice(len(PRIORITIES), size=n, p=[0.1, 0.2, 0.4, 0.2, 0.1])],
+        "tag": np.array(TAGS, dtype=object)[tag],
+        "due_date": (created + pd.to_timedelta(rng.integers(-3, 31, size=n), unit="D")).normalize(),
+        "created_at": created,
+        "completed_at": (created + pd.to_timedelta(rng.integers(1, 241, size=n), unit="h")).where(done),
+        "estimated_hours": estimated,
+        "actual_hours": np.where(done, np.round(estimated * rng.uniform(0.5, 2.0, size=n), 1), 0.0),
+    })
+    # Same dtypes the task stores hand to the app
+    return ensure_columns(df)
+
+
+def make_users(n, seed=0):
+    # users.csv rows: n distinct usernames with password hashes, as the app registers them
+    rng = np.random.default_rng(seed)
+    names = [f"user{i:07d}" for i in rng.permutation(n).tolist()]
+    return pd.DataFrame({"username": names, "password": [hashlib.sha256(name.encode()).hexdigest() for name in names]})
+
+
+def write_dataset(directory, tasks, users=None, user="bench"):
+    # tasks_<user>.csv and users.csv, in the files' stored text format; returns their paths
+    os.makedirs(directory, exist_ok=True)
+    tasks_path = os.path.join(directory, f"tasks_{user}.csv")
+    storage_frame(tasks).to_csv(tasks_path, index=False)
+    users_path = os.path.join(directory, "users.csv")
+    if users is not None:
+        users.to_csv(users_path, index=False)
+    return tasks_path, users_path
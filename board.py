@@ -0,0 +1,131 @@
+from datetime import datetime
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+# ------------------- Board Filters -------------------
+BOARD_PAGE_SIZES = [10, 25, 50, 100]
+
+# (first, last) day offsets from today, inclusive; None leaves that side open
+DUE_WINDOWS = {
+    "Any time": None,
+    "Overdue": (None, -1),
+    "Due today": (0, 0),
+    "Next 3 days": (0, 3),
+    "Next 7 days": (0, 7),
+    "Next 30 days": (0, 30),
+}
+
+
+def filter_board_tasks(df, tags=None, priorities=None, due_window="Any time", today=None):
+    mask = pd.Series(True, index=df.index)
+    if tags:
+        mask &= df["tag"].isin(tags)
+    if priorities:
+        mask &= df["priority"].isin(priorities)
+    window = DUE_WINDOWS.get(due_window)
+    if window:
+        today = pd.Timestamp(today or datetime.now().date())
+        days_left = (df["due_date"] - today).dt.days
+        first, last = window
+        if first is not None:
+            mask &= days_left >= first
+        if last is not None:
+            mask &= days_left <= last
+    return df[mask]
+
+
+def split_columns(df, statuses):
+    # One pass over status instead of a full-column comparison per board column
+    groups = dict(list(df.groupby("status", sort=False, observed=True)))
+    return {status: groups.get(status, df.iloc[:0]) for status in statuses}
+
+
+def column_page(columns, status, limit):
+    # Tasks for one board column, highest priority first, cut to the visible window
+    tasks = columns[status]
+    return tasks.sort_values("priority", kind="stable").head(limit), len(tasks)
+
+
+# ------------------- Board View Model -------------------
+PRIORITY_EMOJIS = {1: "🔴", 2: "🟡", 3: "🟢", 4: "🔵"}
+# Indexed by priority; anything outside 1-4 falls back to slot 0
+PRIORITY_EMOJI_LOOKUP = np.array(["⚫", "🔴", "🟡", "🟢", "🔵"], dtype=object)
+
+CARD_TEMPLATE = """
+<div class="task-card {status_class}">
+    <h4 style="margin: 0; color: {text_color};">{title}</h4>
+    <div style="margin: 0.5rem 0;">
+        <span style="background: #34495e; color: white; padding: 0.2rem 0.5rem; border-radius: 15px; font-size: 0.8rem; margin-right: 0.5rem;">
+            {priority_emoji} P{priority}
+        </span>
+        <span style="background: #3498db; color: white; padding: 0.2rem 0.5rem; border-radius: 15px; font-size: 0.8rem; margin-right: 0.5rem;">
+            🏷️ {tag}
+        </span>
+        <span style="background: #9b59b6; color: white; padding: 0.2rem 0.5rem; border-radius: 15px; font-size: 0.8rem;">
+            ⏱️ {est_hours}h
+        </span>
+    </div>
+    <div style="color: {urgency_color}; font-weight: 600; font-size: 0.9rem;">
+        {urgency_text}
+    </div>
+</div>
+"""
+
+
+# Unchanged cards render to the same string on every rerun, so keep the recent ones around
+@lru_cache(maxsize=4096)
+def render_card(status_class, text_color, title, priority_emoji, priority, tag, est_hours, urgency_color, urgency_text):
+    return CARD_TEMPLATE.format(
+        status_class=status_class, text_color=text_color, title=title,
+        priority_emoji=priority_emoji, priority=priority, tag=tag, est_hours=est_hours,
+        urgency_color=urgency_color, urgency_text=urgency_text,
+    )
+
+
+def build_board_view(df, today=None):
+    # Every per-card display field for a set of tasks, computed column-wise on plain arrays
+    status = df["status"].to_numpy(dtype=object)
+    priority = df["priority"].to_numpy(dtype=float)
+    todo = status == "To Do"
+
+    status_class = np.select(
+        [todo & (priority <= 2), todo & (priority <= 3), todo, status == "In Progress"],
+        ["priority-high", "priority-medium", "priority-low", "task-in-progress"],
+        default="task-done",
+    )
+    text_color = np.where(todo, "#2c3e50", "white")
+    priority_emoji = PRIORITY_EMOJI_LOOKUP[np.where((priority >= 1) & (priority <= 4), priority, 0).astype(int)]
+    priority_label = np.nan_to_num(priority).astype(int)
+
+    tag = df["tag"].to_numpy(dtype=object)
+    task_tag = np.where(pd.isna(tag) | (tag == ""), "General", tag)
+    # Hours are float32 in memory; rounding drops the float32 noise (1.1 -> 1.100000023841858)
+    est_hours = np.nan_to_num(df["estimated_hours"].to_numpy(dtype=float)).round(4)
+
+    today = pd.Timestamp(today or datetime.now().date())
+    days_left = (df["due_date"] - today).dt.days.to_numpy(dtype=float)
+    has_due = ~np.isnan(days_left)
+    days_text = np.abs(np.nan_to_num(days_left)).astype(int).astype(str)
+    no_due, overdue, soon = ~has_due, has_due & (days_left < 0), has_due & (days_left < 3)
+    urgency_color = np.select([no_due, overdue, soon], ["#95a5a6", "#e74c3c", "#f39c12"], default="#27ae60")
+    urgency_prefix = np.select([no_due, overdue, soon], ["📅 No due date", "⚠️ ", "🔥 "], default="📅 ")
+    urgency_suffix = np.select([no_due, overdue], ["", " days overdue"], default=" days left")
+    urgency_text = np.where(no_due, urgency_prefix, np.char.add(np.char.add(urgency_prefix, days_text), urgency_suffix))
+
+    card_html = [
+        render_card(*fields)
+        for fields in zip(
+            status_class, text_color, df["title"].to_numpy(), priority_emoji, priority_label.tolist(),
+            task_tag, est_hours.tolist(), urgency_color, urgency_text,
+        )
+    ]
+    # Only what the render loop reads; rebuilding the full frame costs more than the card fields
+    return pd.DataFrame({
+        "id": df["id"].to_numpy(),
+        "status": status,
+        "actual_hours": df["actual_hours"].to_numpy(dtype=float).round(4),
+        "est_hours": est_hours,
+        "card_html": card_html,
+    }, index=df.index)
@@ -0,0 +1,120 @@
+import io
+import json
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from dedupe import task_keys
+from storage import STATUS_ORDER, TASK_COLUMNS, ensure_columns, new_task_ids
+
+IMPORT_DEFAULTS = {"status": "To Do", "priority": 3, "tag": "Other", "estimated_hours": 1.0, "actual_hours": 0.0}
+MAX_IMPORT_MESSAGES = 20
+
+
+# ------------------- Bulk Import -------------------
+def read_import(name, data):
+    # A CSV file, or JSON as a list of task objects (or {"tasks": [...]})
+    if name.lower().endswith(".json"):
+        records = json.loads(data)
+        if isinstance(records, dict):
+            records = records.get("tasks", [])
+        if not isinstance(records, list):
+            raise ValueError("The JSON file must hold a list of tasks")
+        return pd.DataFrame.from_records(records)
+    return pd.read_csv(io.BytesIO(data), dtype=object, keep_default_na=False)
+
+
+def prepare_import(raw, existing, now=None, duplicates=None):
+    # Validates and deduplicates an uploaded table in one vectorized pass.
+    # Returns the typed tasks to add (with new ids) and a report of what was skipped.
+    # `duplicates` is the user's DuplicateIndex, if there is one, instead of rekeying `existing`.
+    now = now or datetime.now()
+    raw = raw.rename(columns=lambda col: str(col).strip().lower())
+    if "title" not in raw.columns:
+        raise ValueError("The file needs a 'title' column")
+    raw = raw.reset_index(drop=True).astype(object).where(raw.notna(), None)
+
+    def column(col):
+        values = raw[col] if col in raw.columns else pd.Series(None, index=raw.index, dtype=object)
+        values = values.map(lambda value: value.strip() if isinstance(value, str) else value)
+        return values.where(values.notna() & (values != ""), None)
+
+    title = column("title")
+    status = column("status").fillna(IMPORT_DEFAULTS["status"])
+    priority = pd.to_numeric(column("priority").fillna(IMPORT_DEFAULTS["priority"]), errors="coerce")
+    tag = column("tag").fillna(IMPORT_DEFAULTS["tag"])
+    hours = {
+        col: pd.to_numeric(column(col).fillna(IMPORT_DEFAULTS[col]), errors="coerce")
+        for col in ["estimated_hours", "actual_hours"]
+    }
+    dates = {col: pd.to_datetime(column(col), errors="coerce", format="ISO8601") for col in ["due_date", "created_at", "completed_at"]}
+
+    problems = {
+        "missing title": title.isna(),
+        "unknown status": ~status.isin(STATUS_ORDER),
+        "priority must be 1-5": ~priority.isin([1, 2, 3, 4, 5]),
+        "hours must be non-negative numbers": (hours["estimated_hours"].isna() | (hours["estimated_hours"] < 0)
+                                               | hours["actual_hours"].isna() | (hours["actual_hours"] < 0)),
+    }
+    for col, parsed in dates.items():
+        problems[f"unreadable {col}"] = parsed.isna() & column(col).notna()
+    invalid = pd.concat(problems, axis=1)
+    bad = invalid.any(axis=1)
+
+    done = status == "Done"
+    tasks = pd.DataFrame({
+        "title": title,
+        "status": status,
+        "priority": priority,
+        "tag": tag,
+        "due_date": dates["due_date"],
+        "created_at": dates["created_at"].fillna(pd.Timestamp(now)),
+        # Done without a completion time counts as done now; anything else isn't completed
+        "completed_at": dates["completed_at"].where(done).fillna(pd.Timestamp(now)).where(done),
+        "estimated_hours": hours["estimated_hours"],
+        "actual_hours": hours["actual_hours"],
+    })[~bad]
+
+    keys = task_keys(tasks)
+    known = keys.map(duplicates.__contains__).astype(bool) if duplicates is not None else keys.isin(task_keys(existing))
+    duplicate = keys.duplicated() | known
+    tasks = tasks[~duplicate]
+    tasks.insert(0, "id", new_task_ids(len(tasks), above=existing["id"].max() if len(existing) else None))
+
+    messages = [
+        f"row {pos + 1}: {', '.join(invalid.columns[invalid.iloc[pos].to_numpy()])}"
+        for pos in np.flatnonzero(bad.to_numpy())[:MAX_IMPORT_MESSAGES]
+    ]
+    report = {"rows": len(raw), "imported": len(tasks), "duplicates": int(duplicate.sum()), "invalid": int(bad.sum()), "messages": messages}
+    return ensure_columns(tasks[TASK_COLUMNS].reset_index(drop=True)), report
+
+
+# ------------------- Bulk Board Actions -------------------
+BULK_ACTIONS = ["➡️ Move to To Do", "➡️ Move to In Progress", "✅ Close (Done)", "🗑️ Delete"]
+# Most tasks offered one by one in the bulk multiselect; beyond that, filter or select all
+BULK_SELECT_LIMIT = 1000
+
+
+def bulk_targets(action, rows):
+    # The rows a move or close actually changes. Like a single card's status box, a task
+    # already in the target status is left alone, so closing again never moves completed_at.
+    return rows[rows["status"] != bulk_status(action)]
+
+
+def bulk_status(action):
+    return "Done" if action == "✅ Close (Done)" else action.removeprefix("➡️ Move to ")
+
+
+def bulk_fields(action, rows, now=None):
+    # Field updates for a move or close over `rows` (see bulk_targets), as TaskRepository.update_tasks takes them.
+    # Closing does what closing one card does: completed now, actual hours default to the estimate.
+    if action == "✅ Close (Done)":
+        actual = rows["actual_hours"].to_numpy(dtype=float)
+        estimated = rows["estimated_hours"].to_numpy(dtype=float)
+        return {
+            "status": "Done",
+            "completed_at": (now or datetime.now()).isoformat(),
+            "actual_hours": np.where(np.isnan(actual) | (actual == 0), estimated, actual),
+        }
+    return {"status": bulk_status(action)}
@@ -0,0 +1,99 @@
+import os
+import threading
+from collections import OrderedDict
+
+FRAME_CACHE_MAX_MB = float(os.environ.get("FRAME_CACHE_MAX_MB", "256"))
+
+
+def file_signature(*paths):
+    # (path, mtime, size) of every file backing a dataset; a missing file is part of the signature too
+    signature = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            signature.append((path, stat.st_mtime_ns, stat.st_size))
+        except FileNotFoundError:
+            signature.append((path, None, None))
+    return tuple(signature)
+
+
+def frame_nbytes(df):
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+# ------------------- Parsed Frame Cache -------------------
+# Process-wide LRU of parsed DataFrames. Entries are only served while the
+# files they were parsed from still have the same signature, and callers get
+# a copy so edits in one session never leak into the cached frame.
+# Every key also carries a version counter that moves whenever its data may
+# have changed (a write invalidated it or it had to be parsed again), which
+# lets derived results such as metrics be memoized per dataset version.
+class FrameCache:
+    def __init__(self, max_bytes=FRAME_CACHE_MAX_MB * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._versions = {}
+        # key -> (bytes, rows) of the last frame put, kept even when it was too big to hold
+        self._sizes = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, signature):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != signature:
+                self.misses += 1
+                self._bump(key)
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1].copy()
+
+    def put(self, key, signature, df, carry_size=False):
+        # carry_size: the frame is the last one put for this key plus a few edited
+        # rows (see TaskRepository), so its size is scaled from that one's per-row
+        # size instead of a deep scan over every title on each single-task write
+        with self._lock:
+            known = self._sizes.get(key)
+        if carry_size and known is not None and known[1] > 0:
+            nbytes = int(known[0] / known[1] * len(df))
+        else:
+            nbytes = frame_nbytes(df)
+        with self._lock:
+            self._sizes[key] = (nbytes, len(df))
+            self._discard(key)
+            if nbytes > self.max_bytes:
+                return
+            self._entries[key] = (signature, df, nbytes)
+            self.total_bytes += nbytes
+            while self.total_bytes > self.max_bytes:
+                self._discard(next(iter(self._entries)))
+
+    def invalidate(self, key):
+        with self._lock:
+            self._discard(key)
+            self._bump(key)
+
+    def version(self, key):
+        with self._lock:
+            return self._versions.get(key, 0)
+
+    def clear(self):
+        with self._lock:
+            for key in self._entries:
+                self._bump(key)
+            self._entries.clear()
+            self.total_bytes = 0
+
+    def _bump(self, key):
+        self._versions[key] = self._versions.get(key, 0) + 1
+
+    def _discard(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.total_bytes -= entry[2]
+
+
+frame_cache = FrameCache()
@@ -0,0 +1,198 @@
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from instrumentation import stage
+
+STATUS_COLORS = {"To Do": "#3498db", "In Progress": "#f39c12", "Done": "#27ae60"}
+PRIORITY_LABELS = {1: "Critical", 2: "High", 3: "Medium", 4: "Low", 5: "Minimal"}
+
+FIGURE_CACHE_SIZE = int(os.environ.get("FIGURE_CACHE_SIZE", "256"))
+FIGURE_CACHE_MAX_MB = float(os.environ.get("FIGURE_CACHE_MAX_MB", "32"))
+
+
+# ------------------- Figure Cache -------------------
+# Serialized figures keyed by (dataset, version, chart id, params). A rerun
+# that did not change the data hands the stored figure JSON straight back
+# instead of running Plotly Express again. Charts drawn from small aggregates
+# pass those aggregates as `inputs` instead, so an edit that leaves them
+# untouched (say, actual hours on one task) keeps the cached figure.
+# Bounded by entry count and by total JSON size: a scatter of every task can
+# serialize to megabytes, and one larger than the whole budget is not kept.
+_figure_cache = OrderedDict()
+_figure_bytes = 0
+_figure_lock = threading.Lock()
+
+
+def chart_inputs(series):
+    return tuple(series.items())
+
+
+def _store_figure(key, spec):
+    global _figure_bytes
+    old = _figure_cache.pop(key, None)
+    if old is not None:
+        _figure_bytes -= len(old)
+    if len(spec) > FIGURE_CACHE_MAX_MB * 1024 * 1024:
+        return
+    _figure_cache[key] = spec
+    _figure_bytes += len(spec)
+    while len(_figure_cache) > FIGURE_CACHE_SIZE or _figure_bytes > FIGURE_CACHE_MAX_MB * 1024 * 1024:
+        _figure_bytes -= len(_figure_cache.popitem(last=False)[1])
+
+
+def cached_figure(dataset_key, chart_id, build, params=(), inputs=None):
+    if dataset_key is None:
+        with stage(f"chart:{chart_id}"):
+            fig = build()
+        return None if fig is None else json.loads(fig.to_json())
+    dataset, version = dataset_key
+    key = (dataset, version if inputs is None else inputs, chart_id, params)
+    with _figure_lock:
+        spec = _figure_cache.get(key)
+        if spec is not None:
+            _figure_cache.move_to_end(key)
+    if spec is None:
+        # Only cache misses show up as a chart stage
+        with stage(f"chart:{chart_id}"):
+            fig = build()
+            spec = "null" if fig is None else fig.to_json()
+        with _figure_lock:
+            _store_figure(key, spec)
+    return json.loads(spec)
+
+
+# ------------------- Analytics Dashboard Charts -------------------
+# Plotly is imported inside each builder, so it loads the first time a chart
+# actually has to be built; the login screen and the board never pay for it.
+def status_pie(metrics):
+    import plotly.express as px
+
+    status_counts = metrics.status_counts
+    fig_pie = px.pie(
+        values=status_counts.values,
+        names=status_counts.index,
+        color_discrete_map=STATUS_COLORS,
+        title="Task Status Distribution"
+    )
+    fig_pie.update_traces(textposition='inside', textinfo='percent+label')
+    fig_pie.update_layout(height=400, showlegend=True)
+    return fig_pie
+
+
+def priority_bar(metrics):
+    import plotly.express as px
+
+    priority_counts = metrics.priority_counts
+    fig_bar = px.bar(
+        x=[PRIORITY_LABELS[p] for p in priority_counts.index],
+        y=priority_counts.values,
+        color=priority_counts.values,
+        color_continuous_scale="RdYlGn_r",
+        title="Tasks by Priority Level"
+    )
+    fig_bar.update_layout(height=400, xaxis_title="Priority", yaxis_title="Number of Tasks")
+    return fig_bar
+
+
+def category_donut(metrics):
+    import plotly.express as px
+
+    category_counts = metrics.tag_counts
+    fig_donut = px.pie(
+        values=category_counts.values,
+        names=category_counts.index,
+        title="Tasks by Category",
+        hole=0.4
+    )
+    fig_donut.update_traces(textposition='inside', textinfo='percent+label')
+    fig_donut.update_layout(height=400)
+    return fig_donut
+
+
+def completion_trend(daily):
+    # daily: completions per day, from CompletionRollups.daily()
+    if daily.empty:
+        return None
+    import plotly.express as px
+
+    daily_completions = daily.rename_axis("completion_date").reset_index(name="completed_tasks")
+    fig_line = px.line(
+        daily_completions,
+        x='completion_date',
+        y='completed_tasks',
+        title='Daily Task Completions',
+        markers=True
+    )
+    fig_line.update_layout(height=400, xaxis_title="Date", yaxis_title="Tasks Completed")
+    return fig_line
+
+
+# ------------------- Performance Insights Charts -------------------
+def accuracy_scatter(metrics):
+    import plotly.express as px
+
+    accuracy_df = metrics.accuracy
+    fig_accuracy = px.scatter(
+        accuracy_df,
+        x="Estimated",
+        y="Actual",
+        hover_data=["Task", "Accuracy"],
+        title=f"Estimation vs Actual Time (Avg Accuracy: {metrics.avg_accuracy:.1f}%)",
+        color="Accuracy",
+        color_continuous_scale="RdYlGn"
+    )
+    # Add perfect estimation line
+    max_hours = max(accuracy_df["Estimated"].max(), accuracy_df["Actual"].max())
+    fig_accuracy.add_shape(
+        type="line",
+        x0=0, y0=0, x1=max_hours, y1=max_hours,
+        line=dict(color="gray", dash="dash"),
+    )
+    fig_accuracy.update_layout(height=400)
+    return fig_accuracy
+
+
+def efficiency_gauge(metrics):
+    import plotly.graph_objects as go
+
+    fig_gauge = go.Figure(go.Indicator(
+        mode = "gauge+number+delta",
+        value = metrics.time_efficiency,
+        domain = {'x': [0, 1], 'y': [0, 1]},
+        title = {'text': "Time Efficiency %"},
+        delta = {'reference': 100},
+        gauge = {
+            'axis': {'range': [None, 150]},
+            'bar': {'color': "darkblue"},
+            'steps': [
+                {'range': [0, 50], 'color': "lightgray"},
+                {'range': [50, 80], 'color': "yellow"},
+                {'range': [80, 100], 'color': "lightgreen"},
+                {'range': [100, 150], 'color': "green"}
+            ],
+            'threshold': {
+                'line': {'color': "red", 'width': 4},
+                'thickness': 0.75,
+                'value': 100
+            }
+        }
+    ))
+    fig_gauge.update_layout(height=400)
+    return fig_gauge
+
+
+def weekday_bar(weekday_counts):
+    # weekday_counts: completions Monday..Sunday, from CompletionRollups.by_weekday()
+    import plotly.express as px
+
+    fig_weekday = px.bar(
+        x=weekday_counts.index,
+        y=weekday_counts.values,
+        title="Tasks Completed by Day of Week",
+        color=weekday_counts.values,
+        color_continuous_scale="viridis"
+    )
+    fig_weekday.update_layout(xaxis_title="Day", yaxis_title="Tasks Completed")
+    return fig_weekday
@@ -0,0 +1,108 @@
+import math
+import os
+from collections import Counter
+
+import pandas as pd
+
+# exact: a new task is a duplicate when an existing one has the same priority and title.
+# similar: also when an existing title at that priority shares most of its trigrams.
+DUPLICATE_CHECK = os.environ.get("DUPLICATE_CHECK", "exact")
+SIMILAR_TITLE_THRESHOLD = float(os.environ.get("SIMILAR_TITLE_THRESHOLD", "0.6"))
+
+
+# ------------------- Duplicate Keys -------------------
+# Two tasks are duplicates when they have the same priority and the same
+# title once trimmed and lowercased, the rule the task form has always used.
+def task_key(title, priority):
+    priority = int(priority) if pd.notna(priority) else 0
+    return f"{priority}|{str(title).strip().lower()}"
+
+
+def task_keys(df):
+    priority = pd.to_numeric(df["priority"].astype(object), errors="coerce").fillna(0).astype(int).astype(str)
+    return priority + "|" + df["title"].astype(str).str.strip().str.lower()
+
+
+def trigrams(key):
+    # Character trigrams of the key's title, padded so short titles and word edges count
+    title = " ".join(key.split("|", 1)[1].split())
+    padded = f"  {title} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+# ------------------- Duplicate Index -------------------
+# How many tasks hold each key, so checking a new task is a dict lookup
+# whatever the list size. With similar=True it also keeps a
+# trigram -> keys posting list per priority; a near-duplicate lookup then only
+# scores the titles sharing one of the new title's rarest trigrams.
+class DuplicateIndex:
+    def __init__(self, df, similar=False):
+        self.similar = similar
+        self.keys = Counter()
+        self._grams = {}
+        self._gram_sets = {}
+        for key, count in task_keys(df).value_counts().items():
+            self._add(key, count)
+
+    def __contains__(self, key):
+        return key in self.keys
+
+    def _add(self, key, count=1):
+        if key not in self.keys and self.similar:
+            priority, grams = key.split("|", 1)[0], frozenset(trigrams(key))
+            for gram in grams:
+                self._grams.setdefault((priority, gram), set()).add(key)
+            self._gram_sets[key] = grams
+        self.keys[key] += count
+
+    def _remove(self, key):
+        if key not in self.keys:
+            return
+        self.keys[key] -= 1
+        if self.keys[key] > 0:
+            return
+        del self.keys[key]
+        if self.similar:
+            priority = key.split("|", 1)[0]
+            for gram in self._gram_sets.pop(key):
+                postings = self._grams.get((priority, gram))
+                if postings is not None:
+                    postings.discard(key)
+                    if not postings:
+                        del self._grams[(priority, gram)]
+
+    def move(self, before, after):
+        # Keys leaving and joining the list (a single key, an iterable of keys, or None)
+        for keys, step in ((before, self._remove), (after, self._add)):
+            if keys is None:
+                continue
+            for key in [keys] if isinstance(keys, str) else keys:
+                step(key)
+
+    def find(self, title, priority):
+        # The key of an existing duplicate of (title, priority), or None
+        key = task_key(title, priority)
+        if key in self.keys:
+            return key
+        if not self.similar:
+            return None
+        # Prefix filter: a title scoring >= the threshold shares at least `needed` of
+        # these trigrams, so it holds one of the rarest len - needed + 1 of them.
+        # Only titles in those (short) posting lists are scored.
+        priority = key.split("|", 1)[0]
+        grams = trigrams(key)
+        rarest = sorted(grams, key=lambda gram: len(self._grams.get((priority, gram), ())))
+        needed = math.ceil(SIMILAR_TITLE_THRESHOLD * len(grams))
+        candidates = set().union(*(self._grams.get((priority, gram), ()) for gram in rarest[:len(grams) - needed + 1]))
+        # And one scoring >= the threshold can't be much shorter or longer
+        smallest, largest = needed, len(grams) / SIMILAR_TITLE_THRESHOLD
+        best, best_score = None, SIMILAR_TITLE_THRESHOLD
+        for candidate in candidates:
+            candidate_grams = self._gram_sets[candidate]
+            if not smallest <= len(candidate_grams) <= largest:
+                continue
+            common = len(grams & candidate_grams)
+            score = common / (len(grams) + len(candidate_grams) - common)
+            if score >= best_score:
+                best, best_score = candidate, score
+        return best
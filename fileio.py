@@ -0,0 +1,59 @@
+import os
+import tempfile
+from contextlib import contextmanager
+
+import instrumentation
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking, writes are still atomic
+    fcntl = None
+
+
+# ------------------- Atomic Writes -------------------
+# The new content goes to a temp file in the same directory, is fsynced and
+# then renamed over the target, so readers and crashes only ever see the old
+# file or the complete new one, never a truncated mix.
+def atomic_write(path, write, mode=0o644, binary=False):
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=directory)
+    try:
+        with (os.fdopen(fd, "wb") if binary else os.fdopen(fd, "w", encoding="utf-8", newline="")) as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+            instrumentation.count(bytes_written=os.fstat(f.fileno()).st_size)
+        os.chmod(tmp, mode)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    fsync_directory(directory)
+
+
+def fsync_directory(directory):
+    # Makes a rename or a newly created file durable; not possible on Windows
+    if not hasattr(os, "O_DIRECTORY"):
+        return
+    fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+# ------------------- Advisory Locks -------------------
+# flock on a sidecar <path>.lock file, so the lock survives the data file being
+# replaced. Locks belong to an open file, so taking the same one twice in one
+# process blocks: callers hold it once around the whole operation.
+@contextmanager
+def file_lock(path, shared=False):
+    fd = os.open(f"{path}.lock", os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        yield
+    finally:
+        # Closing the descriptor releases the lock
+        os.close(fd)
@@ -0,0 +1,219 @@
+import contextvars
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# on records stage timings; off turns every stage() into a bare yield
+INSTRUMENTATION = os.environ.get("INSTRUMENTATION", "on") != "off"
+# One JSON line per run: a file path, "-" for stderr, empty for none
+TIMING_LOG = os.environ.get("TIMING_LOG", "")
+# Prometheus text exposition file (for a node_exporter textfile collector), rewritten at most every METRICS_FILE_INTERVAL seconds
+METRICS_FILE = os.environ.get("METRICS_FILE", "")
+METRICS_FILE_INTERVAL = float(os.environ.get("METRICS_FILE_INTERVAL", "10"))
+
+# Histogram buckets for stage and run wall time, in seconds
+TIME_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
+
+logger = logging.getLogger("todo.timings")
+if TIMING_LOG:
+    logger.addHandler(logging.StreamHandler(sys.stderr) if TIMING_LOG == "-" else logging.FileHandler(TIMING_LOG))
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+# ------------------- Runs and Stages -------------------
+# A run is one script execution: a full rerun or a fragment rerunning alone.
+# Stages are named, nestable spans inside it. Each records wall time, the rows
+# it processed and the bytes it read and wrote; the stores report bytes through
+# count() into whatever stage is open, and a stage's bytes also count towards
+# the stages around it. Both live in context variables, so concurrent sessions
+# (one script thread each) never mix their records.
+class Run:
+    def __init__(self, kind, user):
+        self.kind = kind
+        self.user = user
+        self.started_at = time.time()
+        self.ms = None
+        self.stages = []
+        self._start = time.perf_counter()
+
+    def finish(self):
+        self.ms = (time.perf_counter() - self._start) * 1000
+        return self
+
+    def as_dict(self):
+        return {"ts": round(self.started_at, 3), "user": self.user, "kind": self.kind,
+                "ms": round(self.ms or 0.0, 3), "stages": self.stages}
+
+
+_run = contextvars.ContextVar("timing_run", default=None)
+_stage = contextvars.ContextVar("timing_stage", default=None)
+
+
+def begin_run(kind, user=None):
+    # Starts recording a run in this context; a run left open (the script was stopped or rerun) is dropped
+    run = Run(kind, user) if INSTRUMENTATION else None
+    _run.set(run)
+    return run
+
+
+def end_run():
+    # Finishes the open run, adds it to the process-wide totals and logs it; returns it (or None)
+    run = _run.get()
+    if run is None:
+        return None
+    _run.set(None)
+    registry.observe_run(run.finish())
+    if TIMING_LOG:
+        logger.info(json.dumps(run.as_dict(), default=str))
+    if METRICS_FILE:
+        registry.write_metrics_file()
+    return run
+
+
+@contextmanager
+def run(kind, user=None):
+    # A whole run as a block: for fragment reruns, which don't go through the top of the script
+    outer = _run.get()
+    current = begin_run(kind, user)
+    try:
+        yield current
+    finally:
+        end_run()
+        _run.set(outer)
+
+
+@contextmanager
+def stage(name, rows=0):
+    if not INSTRUMENTATION:
+        yield None
+        return
+    parent = _stage.get()
+    record = {"stage": name, "ms": 0.0, "rows": rows, "bytes_read": 0, "bytes_written": 0,
+              "depth": parent["depth"] + 1 if parent else 0}
+    token = _stage.set(record)
+    start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record["ms"] = round((time.perf_counter() - start) * 1000, 3)
+        _stage.reset(token)
+        if parent is not None:
+            parent["bytes_read"] += record["bytes_read"]
+            parent["bytes_written"] += record["bytes_written"]
+        current = _run.get()
+        if current is not None:
+            current.stages.append(record)
+        registry.observe_stage(record)
+
+
+def count(rows=0, bytes_read=0, bytes_written=0):
+    # Adds to the innermost open stage; a no-op outside one
+    record = _stage.get()
+    if record is not None:
+        record["rows"] += rows
+        record["bytes_read"] += bytes_read
+        record["bytes_written"] += bytes_written
+
+
+# ------------------- Process Totals -------------------
+# Per stage name: a wall time histogram plus row and byte counters. Per user
+# and run kind: run count, total and slowest run. Exported as Prometheus text.
+class TimingRegistry:
+    def __init__(self):
+        self.stages = {}
+        self.users = {}
+        self._lock = threading.Lock()
+        self._written_at = 0.0
+
+    def observe_stage(self, record):
+        seconds = record["ms"] / 1000
+        with self._lock:
+            stats = self.stages.get(record["stage"])
+            if stats is None:
+                stats = self.stages[record["stage"]] = {
+                    "count": 0, "seconds": 0.0, "max_seconds": 0.0, "rows": 0, "bytes_read": 0, "bytes_written": 0,
+                    "buckets": [0] * len(TIME_BUCKETS),
+                }
+            stats["count"] += 1
+            stats["seconds"] += seconds
+            stats["max_seconds"] = max(stats["max_seconds"], seconds)
+            stats["rows"] += record["rows"]
+            stats["bytes_read"] += record["bytes_read"]
+            stats["bytes_written"] += record["bytes_written"]
+            for i, bound in enumerate(TIME_BUCKETS):
+                if seconds <= bound:
+                    stats["buckets"][i] += 1
+
+    def observe_run(self, run):
+        seconds = run.ms / 1000
+        with self._lock:
+            stats = self.users.setdefault((run.user or "", run.kind), {"count": 0, "seconds": 0.0, "max_seconds": 0.0})
+            stats["count"] += 1
+            stats["seconds"] += seconds
+            stats["max_seconds"] = max(stats["max_seconds"], seconds)
+
+    def slowest_users(self, limit=10):
+        # [(user, kind, runs, mean ms, max ms)], slowest mean first
+        with self._lock:
+            rows = [(user, kind, s["count"], s["seconds"] / s["count"] * 1000, s["max_seconds"] * 1000)
+                    for (user, kind), s in self.users.items()]
+        return sorted(rows, key=lambda row: row[3], reverse=True)[:limit]
+
+    def prometheus_text(self):
+        with self._lock:
+            stages = {name: dict(stats, buckets=list(stats["buckets"])) for name, stats in self.stages.items()}
+            users = {key: dict(stats) for key, stats in self.users.items()}
+        lines = [
+            "# HELP todo_stage_seconds Wall time of named app stages.",
+            "# TYPE todo_stage_seconds histogram",
+        ]
+        for name, stats in sorted(stages.items()):
+            label = f'stage="{_escape(name)}"'
+            for bound, hits in zip(TIME_BUCKETS, stats["buckets"]):
+                lines.append(f'todo_stage_seconds_bucket{{{label},le="{bound}"}} {hits}')
+            lines.append(f'todo_stage_seconds_bucket{{{label},le="+Inf"}} {stats["count"]}')
+            lines.append(f"todo_stage_seconds_sum{{{label}}} {stats['seconds']:.6f}")
+            lines.append(f"todo_stage_seconds_count{{{label}}} {stats['count']}")
+        for metric, key, text in [
+            ("todo_stage_rows_total", "rows", "Rows processed by named app stages."),
+            ("todo_stage_bytes_read_total", "bytes_read", "Bytes read from task storage by named app stages."),
+            ("todo_stage_bytes_written_total", "bytes_written", "Bytes written to task storage by named app stages."),
+        ]:
+            lines += [f"# HELP {metric} {text}", f"# TYPE {metric} counter"]
+            lines += [f'{metric}{{stage="{_escape(name)}"}} {stats[key]}' for name, stats in sorted(stages.items())]
+        lines += ["# HELP todo_user_run_seconds Wall time of script runs per user.", "# TYPE todo_user_run_seconds summary"]
+        for (user, kind), stats in sorted(users.items()):
+            label = f'user="{_escape(user)}",kind="{_escape(kind)}"'
+            lines.append(f"todo_user_run_seconds_sum{{{label}}} {stats['seconds']:.6f}")
+            lines.append(f"todo_user_run_seconds_count{{{label}}} {stats['count']}")
+        lines += ["# HELP todo_user_run_seconds_max Slowest script run per user.", "# TYPE todo_user_run_seconds_max gauge"]
+        for (user, kind), stats in sorted(users.items()):
+            lines.append(f'todo_user_run_seconds_max{{user="{_escape(user)}",kind="{_escape(kind)}"}} {stats["max_seconds"]:.6f}')
+        return "\n".join(lines) + "\n"
+
+    def write_metrics_file(self, path=None, force=False):
+        now = time.monotonic()
+        if not force and now - self._written_at < METRICS_FILE_INTERVAL:
+            return
+        self._written_at = now
+        from fileio import atomic_write
+
+        text = self.prometheus_text()
+        atomic_write(path or METRICS_FILE, lambda f: f.write(text))
+
+    def clear(self):
+        with self._lock:
+            self.stages.clear()
+            self.users.clear()
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+registry = TimingRegistry()
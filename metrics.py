@@ -0,0 +1,189 @@
+import threading
+from collections import OrderedDict
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+
+STATUS_ORDER = ["To Do", "In Progress", "Done"]
+
+
+# ------------------- Estimation Accuracy -------------------
+def estimation_accuracy(df):
+    # min/max of estimated vs actual hours for every completed task that has both
+    done = df[(df["status"] == "Done") & (df["estimated_hours"] > 0) & (df["actual_hours"] > 0)]
+    # Rounded to shed float32 noise before the values reach hover labels
+    estimated = done["estimated_hours"].to_numpy(dtype=float).round(4)
+    actual = done["actual_hours"].to_numpy(dtype=float).round(4)
+    titles = done["title"].astype(str)
+    return pd.DataFrame({
+        "Task": np.where(titles.str.len() > 20, titles.str.slice(0, 20) + "...", titles),
+        "Estimated": estimated,
+        "Actual": actual,
+        "Accuracy": np.minimum(estimated, actual) / np.maximum(estimated, actual) * 100,
+    }, index=done.index)
+
+
+# ------------------- Task Metrics -------------------
+# Every count the sidebar, Analytics and Insights panels show, derived from a
+# single groupby over (status, priority, tag, has-time-data). All the
+# per-panel numbers are then cheap sums over that small grouped frame.
+class TaskMetrics:
+    def __init__(self, df):
+        timed = (df["estimated_hours"] > 0) & (df["actual_hours"] > 0)
+        grouped = (
+            df.assign(timed=timed)
+            .groupby(["status", "priority", "tag", "timed"], dropna=False, sort=False, observed=True)
+            .agg(tasks=("id", "size"), estimated_hours=("estimated_hours", "sum"), actual_hours=("actual_hours", "sum"))
+            .reset_index()
+        )
+        # Grouping on the categorical codes is the fast part; the few grouped rows go back to plain values
+        grouped = grouped.astype({"status": object, "priority": object, "tag": object, "estimated_hours": float, "actual_hours": float})
+        self.grouped = grouped
+        self.total = len(df)
+
+        by_status = grouped.groupby("status", sort=False)["tasks"].sum()
+        self.status_counts = by_status.sort_values(ascending=False, kind="stable")
+        self.done = int(by_status.get("Done", 0))
+        self.in_progress = int(by_status.get("In Progress", 0))
+        self.todo = int(by_status.get("To Do", 0))
+        self.active = self.total - self.done
+        self.completion_rate = self.done / self.total * 100 if self.total > 0 else 0
+
+        by_priority = grouped.groupby("priority")["tasks"].sum()
+        self.priority_counts = by_priority
+        self.avg_priority = (by_priority.index.to_series() * by_priority).sum() / self.total if self.total > 0 else 0
+        high = grouped["priority"] <= 2
+        self.high_priority_total = int(grouped.loc[high, "tasks"].sum())
+        self.high_priority_done = int(grouped.loc[high & (grouped["status"] == "Done"), "tasks"].sum())
+
+        by_tag = grouped.dropna(subset=["tag"]).groupby("tag")["tasks"].sum()
+        self.tag_counts = by_tag.sort_values(ascending=False, kind="stable")
+        self.categories_used = len(by_tag)
+        # Same tie-break as Series.mode(): the lowest label among the most frequent
+        self.most_common_tag = by_tag[by_tag == by_tag.max()].index.min() if not by_tag.empty else "General"
+
+        done = grouped[grouped["status"] == "Done"]
+        self.completed_by_tag = (
+            done.dropna(subset=["tag"])
+            .groupby("tag")
+            .agg(completed_tasks=("tasks", "sum"), estimated_hours=("estimated_hours", "sum"), actual_hours=("actual_hours", "sum"))
+        )
+        done_timed = done[done["timed"]]
+        self.timed_done = int(done_timed["tasks"].sum())
+        self.timed_estimated_hours = float(done_timed["estimated_hours"].sum())
+        self.timed_actual_hours = float(done_timed["actual_hours"].sum())
+        self.time_efficiency = self.timed_estimated_hours / self.timed_actual_hours * 100 if self.timed_actual_hours > 0 else 100
+        self._df = df
+
+    def status_count(self, status):
+        return int(self.status_counts.get(status, 0))
+
+    # Row-level and only needed by Performance Insights, so built on first use
+    @cached_property
+    def accuracy(self):
+        return estimation_accuracy(self._df)
+
+    @cached_property
+    def avg_accuracy(self):
+        return float(self.accuracy["Accuracy"].mean()) if not self.accuracy.empty else None
+
+
+# ------------------- Completion Rollups -------------------
+# Completed tasks counted per day, weekday, hour and tag, so the trend and
+# weekday charts read O(days) counters instead of regrouping every task.
+# A task counts while its status is Done and it has a completed_at.
+WEEKDAY_ORDER = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+
+def completion_of(df, pos):
+    # (completed_at, tag) of the task at row `pos` if it counts as completed, else None
+    if df["status"].iat[pos] != "Done" or pd.isna(df["completed_at"].iat[pos]):
+        return None
+    return pd.Timestamp(df["completed_at"].iat[pos]), df["tag"].iat[pos]
+
+
+class CompletionRollups:
+    def __init__(self, df):
+        done = df[df["status"] == "Done"]
+        completed_at = done["completed_at"].dropna()
+        tags = done.loc[completed_at.index, "tag"].dropna().astype(object)
+        self.days = dict(completed_at.dt.normalize().value_counts())
+        self.weekdays = dict(completed_at.dt.weekday.value_counts())
+        self.hours = dict(completed_at.dt.hour.value_counts())
+        self.tags = dict(tags.value_counts())
+        self.total = len(completed_at)
+
+    def move(self, before, after):
+        # States are completion_of() results (None: not completed / gone)
+        for state, step in ((before, -1), (after, 1)):
+            if state is None:
+                continue
+            completed_at, tag = state
+            self._count(self.days, completed_at.normalize(), step)
+            self._count(self.weekdays, completed_at.weekday(), step)
+            self._count(self.hours, completed_at.hour, step)
+            if pd.notna(tag):
+                self._count(self.tags, tag, step)
+            self.total += step
+
+    @staticmethod
+    def _count(counts, key, step):
+        counts[key] = counts.get(key, 0) + step
+        if counts[key] <= 0:
+            del counts[key]
+
+    def daily(self):
+        return pd.Series(self.days, dtype="int64").sort_index().rename_axis("completion_date")
+
+    def by_weekday(self):
+        return pd.Series([self.weekdays.get(day, 0) for day in range(7)], index=WEEKDAY_ORDER, dtype="int64")
+
+    def by_hour(self):
+        return pd.Series([self.hours.get(hour, 0) for hour in range(24)], index=range(24), dtype="int64")
+
+    def by_tag(self):
+        return pd.Series(self.tags, dtype="int64").sort_values(ascending=False, kind="stable")
+
+
+# ------------------- Analytics Windows -------------------
+# Days back from today (today included) for the analytics date-range selector
+ANALYTICS_WINDOWS = {"All time": None, "Last 7 days": 7, "Last 30 days": 30, "Last 90 days": 90, "Custom": None}
+
+
+def window_bounds(choice, today=None, custom=None):
+    # (start, end) for TaskRepository.window(), or None for the whole history
+    today = pd.Timestamp(today or pd.Timestamp.now()).normalize()
+    if choice == "Custom":
+        if not custom:
+            return None
+        first, last = (list(custom) * 2)[:2] if isinstance(custom, (list, tuple)) else (custom, custom)
+        return pd.Timestamp(first), pd.Timestamp(last) + pd.Timedelta(days=1)
+    days = ANALYTICS_WINDOWS.get(choice)
+    if days is None:
+        return None
+    return today - pd.Timedelta(days=days - 1), today + pd.Timedelta(days=1)
+
+
+_metrics_cache = OrderedDict()
+_metrics_lock = threading.Lock()
+METRICS_CACHE_SIZE = 64
+
+
+def get_task_metrics(df, dataset_key=None):
+    # dataset_key is (dataset, version); metrics are rebuilt only when the version moves
+    if dataset_key is None:
+        return TaskMetrics(df)
+    dataset, version = dataset_key
+    with _metrics_lock:
+        cached = _metrics_cache.get(dataset)
+        if cached is not None and cached[0] == version:
+            _metrics_cache.move_to_end(dataset)
+            return cached[1]
+    metrics = TaskMetrics(df)
+    with _metrics_lock:
+        _metrics_cache[dataset] = (version, metrics)
+        _metrics_cache.move_to_end(dataset)
+        while len(_metrics_cache) > METRICS_CACHE_SIZE:
+            _metrics_cache.popitem(last=False)
+    return metrics
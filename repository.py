@@ -0,0 +1,461 @@
+import atexit
+import os
+import threading
+import weakref
+
+import numpy as np
+import pandas as pd
+
+from dedupe import DUPLICATE_CHECK, DuplicateIndex, task_key, task_keys
+from metrics import CompletionRollups, completion_of
+from search import SearchIndex, task_document, task_documents
+from storage import (
+    TASK_COLUMNS, WINDOW_COLUMNS, StaleWriteError, append_tasks, coalesce_changes, coerce_value, ensure_columns, insert_changes,
+    set_task_fields, set_tasks_field,
+)
+
+# sync: every edit reaches the store before the click returns.
+# batched: edits are queued and flushed (fsynced) every FLUSH_INTERVAL_MS or FLUSH_MAX_OPS edits.
+# async: as batched, but flushes skip fsync and leave it to the OS.
+DURABILITY_MODES = ["sync", "batched", "async"]
+TASK_DURABILITY = os.environ.get("TASK_DURABILITY", "sync")
+FLUSH_INTERVAL_MS = int(os.environ.get("TASK_FLUSH_INTERVAL_MS", "500"))
+FLUSH_MAX_OPS = int(os.environ.get("TASK_FLUSH_MAX_OPS", "50"))
+# Failed flushes in a row before the queued edits are given up (see TaskRepository.flush)
+FLUSH_MAX_RETRIES = int(os.environ.get("TASK_FLUSH_MAX_RETRIES", "5"))
+
+
+# ------------------- Task Repository -------------------
+# In-memory task list plus an id -> row position index, so single-task edits
+# resolve in O(1) and only the changed row is handed to the store.
+# Writes are copy-on-write: each one builds a new frame (sharing every column
+# it did not touch) and swaps it in, so a reader holding the previous frame
+# keeps a consistent snapshot. `revision` counts swaps.
+# Every store write carries the signature this copy was built from. If another
+# process wrote in between, the row-level change still lands and the copy is
+# reloaded to merge both; full saves are refused instead (see StaleWriteError).
+# In the write-behind modes edits only touch memory and queue a journal op;
+# flush() hands the queued ops to the store as one coalesced batch.
+# Completion rollups, the (title, priority) duplicate index, the search index
+# and the time index behind window() are DerivedIndexes of the frame.
+class TaskRepository:
+    def __init__(self, user, store, df=None, durability=None):
+        durability = durability or TASK_DURABILITY
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"Unknown durability '{durability}', expected one of {DURABILITY_MODES}")
+        self.user = user
+        self.store = store
+        self.durability = durability
+        self.flush_error = None
+        # Queued edits given up after FLUSH_MAX_RETRIES failed flushes, oldest first
+        self.dropped_changes = []
+        self._pending = []
+        self._flush_failures = 0
+        self._lock = threading.RLock()
+        self.revision = 0
+        self._load(df)
+
+    def _load(self, df=None):
+        # Signature first: a write landing during the load makes the next refresh reload again
+        self.signature = self.store.signature(self.user) if df is None else None
+        # Only a frame read from the store may stand in for it in the frame cache; one handed
+        # in (the app's empty fallback after a failed load, say) can hold a fraction of it
+        self.cacheable = df is None
+        self.df = (self.store.load(self.user) if df is None else df).reset_index(drop=True)
+        self._columns = {col: i for i, col in enumerate(self.df.columns)}
+        self._reindex()
+        self.version = self.store.data_version(self.user)
+        self._rollups = DerivedIndex(CompletionRollups)
+        self._duplicates = DerivedIndex(lambda df: DuplicateIndex(df, similar=DUPLICATE_CHECK == "similar"))
+        self._search = DerivedIndex(SearchIndex)
+        # Never moved: rebuilt once per revision that asks for a window
+        self._time_index = DerivedIndex(TimeIndex)
+
+    @property
+    def dataset_key(self):
+        # Queued edits change the data without moving the store's version, so the revision is part of it
+        return (self.store.cache_key(self.user), (self.version, self.revision))
+
+    @property
+    def pending(self):
+        return len(self._pending)
+
+    @property
+    def rollups(self):
+        with self._lock:
+            return self._rollups.get(self.df, self.revision)
+
+    @property
+    def duplicates(self):
+        with self._lock:
+            return self._duplicates.get(self.df, self.revision)
+
+    def find_duplicate(self, title, priority):
+        # Key of an existing task the new (title, priority) would duplicate, or None
+        with self._lock:
+            return self.duplicates.find(title, priority)
+
+    @property
+    def search_index(self):
+        with self._lock:
+            return self._search.get(self.df, self.revision)
+
+    def search(self, query):
+        # Tasks whose title or tag matches `query`, best match first
+        with self._lock:
+            ids = self.search_index.search(query)
+            if len(ids) * 10 < len(self.df):
+                positions = [self.positions[task_id] for task_id in ids.tolist()]
+            else:
+                # Past a few thousand ids one vectorized lookup beats the dict, even counting its build
+                positions = pd.Index(self.df["id"]).get_indexer(ids)
+            return self.df.take(positions).reset_index(drop=True)
+
+    def window(self, start=None, end=None, columns=WINDOW_COLUMNS):
+        # Tasks created or completed in [start, end), in frame order
+        with self._lock:
+            time_index = self._time_index.get(self.df, self.revision)
+            return self.df.take(time_index.positions(start, end, columns)).reset_index(drop=True)
+
+    def _key(self, df, pos):
+        return task_key(df["title"].iat[pos], df["priority"].iat[pos])
+
+    def _document(self, df, pos):
+        return task_document(df["id"].iat[pos], df["title"].iat[pos], df["tag"].iat[pos])
+
+    def _reindex(self):
+        self.positions = {task_id: pos for pos, task_id in enumerate(self.df["id"].tolist())}
+
+    def _position(self, task_id):
+        try:
+            return self.positions[int(task_id)]
+        except KeyError:
+            raise ValueError(f"Task {task_id} no longer exists") from None
+
+    def _written(self, signature):
+        if signature is None:
+            # The store moved on without us: our change is in it, so reload to pick up the others
+            self._load()
+        elif not self._pending:
+            # Queued edits aren't in the store yet, so this frame can't stand in for its content
+            self._cache(signature)
+        self.revision += 1
+
+    def _cache(self, signature):
+        # After a write that landed on the signature this copy was built from
+        if self.cacheable:
+            self.store.cache_frame(self.user, self.df, signature)
+            self.signature = signature
+        else:
+            self.store.invalidate_cache(self.user)
+        self.version = self.store.data_version(self.user)
+
+    def _store(self, changes, write, *args):
+        # `changes` builds the journal ops; only called when they are queued
+        if self.durability == "sync":
+            return self._write(write, *args)
+        self._pending.extend(changes())
+        flusher.schedule(self, urgent=len(self._pending) >= FLUSH_MAX_OPS)
+        return self.signature
+
+    def _write(self, write, *args):
+        try:
+            return write(self.user, *args, expected=self.signature)
+        except StaleWriteError:
+            self._load()
+            self.revision += 1
+            raise
+
+    def refresh(self):
+        # Picks up writes made outside this process (another worker, a CLI migration).
+        # Skipped while edits are queued: the next flush notices and reloads.
+        with self._lock:
+            if not self._pending and self.signature is not None and self.store.signature(self.user) != self.signature:
+                self._load()
+                self.revision += 1
+        return self
+
+    def save(self, df):
+        # Replaces the whole task list, unless someone else wrote since this copy was loaded
+        with self._lock:
+            self.flush()
+            df = ensure_columns(df.reset_index(drop=True))
+            signature = self._write(self.store.save, df)
+            self.df = df
+            self._columns = {col: i for i, col in enumerate(self.df.columns)}
+            self._reindex()
+            self._written(signature)
+
+    def __len__(self):
+        return len(self.df)
+
+    def __contains__(self, task_id):
+        return int(task_id) in self.positions
+
+    def get_task(self, task_id):
+        return self.df.iloc[self._position(task_id)]
+
+    def add_task(self, task):
+        task = {col: task.get(col, "") for col in TASK_COLUMNS}
+        task["id"] = coerce_value("id", task["id"])
+        with self._lock:
+            if task["id"] in self.positions:
+                raise ValueError(f"Task {task['id']} already exists")
+            signature = self._store(lambda: [{"op": "insert", "id": str(task["id"]), "task": task}], self.store.insert, task)
+            self.df = append_tasks(self.df, ensure_columns(pd.DataFrame([task], columns=TASK_COLUMNS)))
+            self._columns = {col: i for i, col in enumerate(self.df.columns)}
+            self.positions[task["id"]] = len(self.df) - 1
+            pos = len(self.df) - 1
+            self._rollups.advance(self.revision, None, completion_of(self.df, pos))
+            self._duplicates.advance(self.revision, None, self._key(self.df, pos))
+            self._search.advance(self.revision, None, self._document(self.df, pos))
+            self._written(signature)
+
+    def update_task(self, task_id, **fields):
+        unknown = set(fields) - set(self._columns)
+        if unknown:
+            raise ValueError(f"Unknown task fields: {sorted(unknown)}")
+        with self._lock:
+            pos = self._position(task_id)
+            signature = self._store(lambda: [{"op": "update", "id": str(task_id), "fields": fields}], self.store.update, task_id, fields)
+            # Only the edited columns are copied; the rest stay shared with the previous frame
+            df = self.df.copy(deep=False)
+            for col in fields:
+                df[col] = df[col].copy()
+            set_task_fields(df, pos, fields, self._columns)
+            self._rollups.advance(self.revision, completion_of(self.df, pos), completion_of(df, pos))
+            if "title" in fields or "priority" in fields:
+                self._duplicates.advance(self.revision, self._key(self.df, pos), self._key(df, pos))
+            else:
+                self._duplicates.advance(self.revision)
+            if "title" in fields or "tag" in fields:
+                self._search.advance(self.revision, self._document(self.df, pos), self._document(df, pos))
+            else:
+                self._search.advance(self.revision)
+            self.df = df
+            self._written(signature)
+
+    def delete_task(self, task_id):
+        with self._lock:
+            pos = self._position(task_id)
+            signature = self._store(lambda: [{"op": "delete", "id": str(task_id)}], self.store.delete, task_id)
+            self._rollups.advance(self.revision, completion_of(self.df, pos), None)
+            self._duplicates.advance(self.revision, self._key(self.df, pos), None)
+            self._search.advance(self.revision, self._document(self.df, pos), None)
+            self.df = self.df.drop(index=pos).reset_index(drop=True)
+            self._reindex()
+            self._written(signature)
+
+    # ---- Bulk operations: one store write (or one queued batch) each. The
+    # rollups are left to rebuild on their next read instead of being moved
+    # task by task; the duplicate and search indexes take the affected rows.
+    def add_tasks(self, tasks):
+        tasks = ensure_columns(tasks[TASK_COLUMNS].reset_index(drop=True))
+        with self._lock:
+            ids = tasks["id"]
+            clashes = ids[ids.duplicated() | ids.map(self.positions.__contains__)].tolist()
+            if clashes:
+                raise ValueError(f"Tasks already exist: {clashes[:5]}")
+            signature = self._store(lambda: insert_changes(tasks), self.store.insert_many, tasks)
+            start = len(self.df)
+            self.df = append_tasks(self.df, tasks)
+            self._columns = {col: i for i, col in enumerate(self.df.columns)}
+            self.positions.update(zip(tasks["id"].tolist(), range(start, len(self.df))))
+            self._duplicates.advance(self.revision, None, task_keys(tasks))
+            self._search.advance(self.revision, None, task_documents(tasks))
+            self._written(signature)
+        return len(tasks)
+
+    def update_tasks(self, task_ids, **fields):
+        # Each field is one value for every task or a sequence aligned with task_ids
+        unknown = set(fields) - set(self._columns)
+        if unknown:
+            raise ValueError(f"Unknown task fields: {sorted(unknown)}")
+        task_ids = list(task_ids)
+        per_task = [
+            {col: value[i] if pd.api.types.is_list_like(value) else value for col, value in fields.items()}
+            for i in range(len(task_ids))
+        ]
+        changes = [{"op": "update", "id": str(task_id), "fields": task_fields} for task_id, task_fields in zip(task_ids, per_task)]
+        with self._lock:
+            positions = [self._position(task_id) for task_id in task_ids]
+            signature = self._store(lambda: changes, self.store.write_changes, changes)
+            df = self.df.copy(deep=False)
+            for col, value in fields.items():
+                df[col] = df[col].copy()
+                set_tasks_field(df, positions, col, value)
+            if "title" in fields or "priority" in fields:
+                self._duplicates.advance(self.revision, task_keys(self.df.iloc[positions]), task_keys(df.iloc[positions]))
+            else:
+                self._duplicates.advance(self.revision)
+            if "title" in fields or "tag" in fields:
+                self._search.advance(self.revision, task_documents(self.df.iloc[positions]), task_documents(df.iloc[positions]))
+            else:
+                self._search.advance(self.revision)
+            self.df = df
+            self._written(signature)
+        return len(task_ids)
+
+    def delete_tasks(self, task_ids):
+        task_ids = list(task_ids)
+        changes = [{"op": "delete", "id": str(task_id)} for task_id in task_ids]
+        with self._lock:
+            positions = [self._position(task_id) for task_id in task_ids]
+            signature = self._store(lambda: changes, self.store.write_changes, changes)
+            self._duplicates.advance(self.revision, task_keys(self.df.iloc[positions]), None)
+            self._search.advance(self.revision, task_documents(self.df.iloc[positions]), None)
+            self.df = self.df.drop(index=positions).reset_index(drop=True)
+            self._reindex()
+            self._written(signature)
+        return len(task_ids)
+
+    def flush(self):
+        # Writes queued edits to the store; on failure they stay queued for the next attempt.
+        # A batch the store keeps refusing (an id another process took, a row deleted
+        # elsewhere) is given up after FLUSH_MAX_RETRIES attempts: its edits move to
+        # dropped_changes and the copy reloads from the store, instead of retrying forever
+        # with refresh() held off by the pending edits.
+        with self._lock:
+            if not self._pending:
+                return 0
+            changes = coalesce_changes(self._pending)
+            try:
+                signature = self.store.write_changes(
+                    self.user, changes, expected=self.signature, durable=self.durability != "async"
+                )
+            except Exception as e:
+                self.flush_error = e
+                self._flush_failures += 1
+                if self._flush_failures < FLUSH_MAX_RETRIES:
+                    raise
+                self.dropped_changes.extend(changes)
+                self._pending = []
+                self._flush_failures = 0
+                self._load()
+                self.revision += 1
+                return 0
+            self._pending = []
+            self.flush_error = None
+            self._flush_failures = 0
+            if signature is None:
+                self._load()
+                self.revision += 1
+            else:
+                self._cache(signature)
+            return len(changes)
+
+
+# ------------------- Derived Indexes -------------------
+# An index derived from the task frame, built from the whole frame on first
+# use and then moved task by task as writes happen, so a write never rescans
+# the frame. `build(df)` makes the index; its move(before, after) takes what
+# the write removed and what it added (None: nothing), in the index's own
+# terms (a completion state, duplicate keys, search documents). `revision` is
+# the repository revision the index describes: a reload or a write it did not
+# see leaves it behind, and the next read rebuilds it.
+class DerivedIndex:
+    def __init__(self, build):
+        self.build = build
+        self.index = None
+        self.revision = None
+
+    def get(self, df, revision):
+        if self.index is None or self.revision != revision:
+            self.index = self.build(df)
+            self.revision = revision
+        return self.index
+
+    def advance(self, revision, before=None, after=None):
+        # Called just before the write's _written(): moves an index built at
+        # `revision` to the revision that write produces
+        if self.index is not None and self.revision == revision:
+            self.index.move(before, after)
+            self.revision = revision + 1
+
+
+# ------------------- Time Index -------------------
+# Row positions sorted by created_at and by completed_at: a window is two
+# binary searches per column plus the rows it returns, however long the
+# history. Missing dates sort last and are never inside a window.
+class TimeIndex:
+    def __init__(self, df):
+        self._sorted = {}
+        for col in WINDOW_COLUMNS:
+            values = df[col].to_numpy(dtype="datetime64[us]")
+            order = np.argsort(values, kind="stable")
+            self._sorted[col] = (values[order], order, int((~np.isnat(values)).sum()))
+        self.rows = len(df)
+
+    def positions(self, start=None, end=None, columns=WINDOW_COLUMNS):
+        # Merged through a row mask: far cheaper than sorting the hits (np.unique) for big windows
+        hits = np.zeros(self.rows, dtype=bool)
+        for col in columns:
+            values, order, dated = self._sorted[col]
+            lo = 0 if start is None else np.searchsorted(values[:dated], np.datetime64(pd.Timestamp(start), "us"))
+            hi = dated if end is None else np.searchsorted(values[:dated], np.datetime64(pd.Timestamp(end), "us"))
+            hits[order[lo:hi]] = True
+        return np.flatnonzero(hits)
+
+
+# ------------------- Write-Behind Flusher -------------------
+# One background thread per process flushes every repository with queued
+# edits each FLUSH_INTERVAL_MS, or right away once one reaches FLUSH_MAX_OPS.
+# Repositories stay referenced here until flushed, so queued edits can't be
+# dropped with a closed session; whatever is left is flushed at exit.
+class WriteBehindFlusher:
+    def __init__(self, interval_ms=FLUSH_INTERVAL_MS):
+        self.interval = interval_ms / 1000
+        self._repositories = set()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def schedule(self, repo, urgent=False):
+        with self._lock:
+            self._repositories.add(repo)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="task-flusher", daemon=True)
+                self._thread.start()
+        if urgent:
+            self._wake.set()
+
+    def flush_all(self):
+        with self._lock:
+            repositories, self._repositories = self._repositories, set()
+        for repo in repositories:
+            try:
+                repo.flush()
+            except Exception:
+                # Kept queued (and reported through repo.flush_error); retried next round, up to FLUSH_MAX_RETRIES
+                with self._lock:
+                    self._repositories.add(repo)
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            self.flush_all()
+
+
+flusher = WriteBehindFlusher()
+atexit.register(flusher.flush_all)
+
+
+# ------------------- Shared Repositories -------------------
+# One repository per user and store for the whole process, shared by every
+# session that user has open (tabs, devices). Held weakly: it lives as long as
+# some session still references it, then the memory goes back.
+_shared_repositories = weakref.WeakValueDictionary()
+_shared_lock = threading.Lock()
+
+
+def get_shared_repository(user, store):
+    key = store.cache_key(user)
+    with _shared_lock:
+        repo = _shared_repositories.get(key)
+    if repo is not None:
+        return repo.refresh()
+    repo = TaskRepository(user, store)
+    with _shared_lock:
+        # Another session may have loaded the same user meanwhile; keep the first
+        return _shared_repositories.setdefault(key, repo)
@@ -0,0 +1,158 @@
+import bisect
+import math
+import re
+
+import numpy as np
+import pandas as pd
+
+# A term found in the title counts this much more than one found in the tag
+TITLE_WEIGHT = 2.0
+TAG_WEIGHT = 1.0
+# A prefix match ("rep" -> "report") counts less than the whole word
+PREFIX_WEIGHT = 0.5
+# Longest list of completions a prefix expands to
+MAX_PREFIX_TERMS = 200
+
+_TOKEN = re.compile(r"\w+")
+
+
+def tokenize(text):
+    return [] if pd.isna(text) else _TOKEN.findall(str(text).lower())
+
+
+def task_document(task_id, title, tag):
+    # (id, {term: weight}) for one task, or None for a task without searchable text
+    weights = {}
+    for terms, weight in ((tokenize(title), TITLE_WEIGHT), (tokenize(tag), TAG_WEIGHT)):
+        for term in terms:
+            weights[term] = weights.get(term, 0.0) + weight
+    return (int(task_id), weights) if weights else None
+
+
+def task_documents(df):
+    return list(map(task_document, df["id"].tolist(), df["title"].tolist(), df["tag"].astype(object).tolist()))
+
+
+# ------------------- Search Index -------------------
+# Inverted index over task titles and tags: term -> {slot: weight}, where each
+# task holds a slot in a dense id array, so a query only touches the posting
+# lists of its own terms. Those are scored as numpy arrays (cached
+# per term until the term's postings change), touching only the slots in the
+# query terms' postings, never an array the size of the whole index.
+# Every term must match, the last one also as a prefix for search as you
+# type; matches are ranked by tf-idf, newest first among equals.
+class SearchIndex:
+    def __init__(self, df):
+        self.postings = {}
+        self.documents = {}
+        self._arrays = {}
+        self._slots = {}
+        self._free = []
+        self._ids = np.full(max(len(df), 16), -1, dtype="int64")
+        # Sorted vocabulary, for prefix lookups of the last term
+        self._terms = []
+        for doc in task_documents(df):
+            self._add(doc)
+
+    def __len__(self):
+        return len(self.documents)
+
+    def _add(self, doc):
+        if doc is None:
+            return
+        task_id, weights = doc
+        self._remove(doc)
+        if self._free:
+            slot = self._free.pop()
+        else:
+            slot = len(self._slots)
+            if slot == len(self._ids):
+                self._ids = np.concatenate([self._ids, np.full(len(self._ids), -1, dtype="int64")])
+        self._slots[task_id] = slot
+        self._ids[slot] = task_id
+        self.documents[task_id] = weights
+        for term, weight in weights.items():
+            postings = self.postings.get(term)
+            if postings is None:
+                postings = self.postings[term] = {}
+                bisect.insort(self._terms, term)
+            postings[slot] = weight
+            self._arrays.pop(term, None)
+
+    def _remove(self, doc):
+        if doc is None or doc[0] not in self.documents:
+            return
+        task_id = doc[0]
+        slot = self._slots.pop(task_id)
+        self._ids[slot] = -1
+        self._free.append(slot)
+        for term in self.documents.pop(task_id):
+            postings = self.postings[term]
+            del postings[slot]
+            self._arrays.pop(term, None)
+            if not postings:
+                del self.postings[term]
+                del self._terms[bisect.bisect_left(self._terms, term)]
+
+    def move(self, before, after):
+        # Documents leaving and joining the index (one, a list, or None)
+        for docs, step in ((before, self._remove), (after, self._add)):
+            if docs is None:
+                continue
+            for doc in [docs] if isinstance(docs, tuple) else docs:
+                step(doc)
+
+    def _expand(self, term):
+        # Indexed terms starting with `term`, at most MAX_PREFIX_TERMS of them
+        start = bisect.bisect_left(self._terms, term)
+        end = bisect.bisect_left(self._terms, term + "\uffff", lo=start, hi=min(start + MAX_PREFIX_TERMS, len(self._terms)))
+        return self._terms[start:end]
+
+    def _array(self, term):
+        # (slots, weights) of the term's postings, sorted by slot
+        arrays = self._arrays.get(term)
+        if arrays is None:
+            postings = self.postings[term]
+            slots = np.fromiter(postings.keys(), dtype="int64", count=len(postings))
+            weights = np.fromiter(postings.values(), dtype=float, count=len(postings))
+            order = np.argsort(slots, kind="stable")
+            arrays = self._arrays[term] = (slots[order], weights[order])
+        return arrays
+
+    def _term_scores(self, term, matches):
+        # (sorted slots, score) of the tasks holding `term` or one of its expansions
+        total = len(self.documents)
+        parts = []
+        for match in matches:
+            slots, weights = self._array(match)
+            parts.append((slots, weights * (math.log(1 + total / len(slots)) * (1.0 if match == term else PREFIX_WEIGHT))))
+        if len(parts) == 1:
+            return parts[0]
+        slots = np.concatenate([p[0] for p in parts])
+        scores = np.concatenate([p[1] for p in parts])
+        # A prefix term counts its best expansion in each task
+        order = np.argsort(slots, kind="stable")
+        slots, scores = slots[order], scores[order]
+        unique, starts = np.unique(slots, return_index=True)
+        return unique, np.maximum.reduceat(scores, starts)
+
+    def search(self, query):
+        # Ids of the tasks matching every term of `query`, best first
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or not self.documents:
+            return np.empty(0, dtype="int64")
+        matched = scores = None
+        for i, term in enumerate(terms):
+            matches = self._expand(term) if i == len(terms) - 1 else [term] if term in self.postings else []
+            if not matches:
+                return np.empty(0, dtype="int64")
+            slots, term_scores = self._term_scores(term, matches)
+            if matched is None:
+                matched, scores = slots, term_scores
+            else:
+                matched, ours, theirs = np.intersect1d(matched, slots, assume_unique=True, return_indices=True)
+                scores = scores[ours] + term_scores[theirs]
+            if not len(matched):
+                return np.empty(0, dtype="int64")
+        ids = self._ids[matched]
+        return ids[np.lexsort((-ids, -scores))]
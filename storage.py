@@ -0,0 +1,804 @@
+import json
+import os
+import random
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import instrumentation
+from cache import file_signature, frame_cache
+from fileio import atomic_write, file_lock
+
+# ------------------- Task Schema -------------------
+TASK_COLUMNS = ["id", "title", "status", "priority", "tag", "due_date", "created_at", "completed_at", "estimated_hours", "actual_hours"]
+NUMERIC_COLUMNS = ["estimated_hours", "actual_hours"]
+DATE_COLUMNS = ["due_date", "created_at", "completed_at"]
+TEXT_COLUMNS = ["title"]
+
+# Canonical in-memory schema: small fixed vocabularies are categoricals, so a
+# session pays one byte code per row instead of a Python string, dates are
+# datetime64, hours float32 and ids int64. Values outside the known
+# categories (older files, imports) are kept as extra categories.
+STATUS_ORDER = ["To Do", "In Progress", "Done"]
+TASK_TAGS = ["Data Analysis", "Visualization", "Research", "Reporting", "Learning", "Meeting", "Other"]
+PRIORITIES = [1, 2, 3, 4, 5]
+CATEGORICAL_COLUMNS = {"status": (STATUS_ORDER, False), "priority": (PRIORITIES, True), "tag": (TASK_TAGS, False)}
+HOURS_DTYPE = "float32"
+
+TASK_BACKEND = os.environ.get("TASK_BACKEND", "sqlite")
+TASK_DB_FILE = os.environ.get("TASK_DB_FILE", "tasks.db")
+JOURNAL_COMPACT_EVERY = int(os.environ.get("TASK_JOURNAL_COMPACT_EVERY", "500"))
+
+
+class StaleWriteError(ValueError):
+    # A full save based on a version of the tasks that someone else has since changed
+    pass
+
+
+def empty_tasks():
+    return pd.DataFrame(columns=TASK_COLUMNS)
+
+
+def _categorical(series, categories, ordered):
+    if isinstance(series.dtype, pd.CategoricalDtype) and list(series.cat.categories[:len(categories)]) == categories:
+        return series
+    extra = sorted((value for value in pd.unique(series.dropna()) if value not in categories), key=str)
+    return pd.Series(pd.Categorical(series, categories=categories + extra, ordered=ordered), index=series.index)
+
+
+def ensure_columns(df):
+    # Brings a frame to the canonical schema
+    for col in TASK_COLUMNS:
+        if col not in df.columns:
+            df[col] = "" if col not in NUMERIC_COLUMNS else 0
+        df[col] = _typed_column(col, df[col])
+    return df
+
+
+def _typed_column(col, series):
+    if col == "id":
+        return pd.to_numeric(series, errors="raise").astype("int64")
+    if col == "title":
+        # Titles stay plain objects so single-cell edits never hit a dtype mismatch
+        return series.astype(object)
+    if col in CATEGORICAL_COLUMNS:
+        if col == "priority":
+            series = pd.to_numeric(series, errors="coerce") if not isinstance(series.dtype, pd.CategoricalDtype) else series
+        elif not isinstance(series.dtype, pd.CategoricalDtype):
+            series = series.where(series != "")
+        categories, ordered = CATEGORICAL_COLUMNS[col]
+        return _categorical(series, categories, ordered)
+    if col in DATE_COLUMNS:
+        if pd.api.types.is_datetime64_any_dtype(series):
+            return series
+        return pd.to_datetime(series.astype(object), errors="coerce", format="ISO8601")
+    if col in NUMERIC_COLUMNS:
+        return pd.to_numeric(series, errors="coerce").astype(HOURS_DTYPE)
+    return series
+
+
+def coerce_value(col, value):
+    # One incoming field value (widget, journal or form) in its schema type
+    if col == "id":
+        return int(value)
+    if col in DATE_COLUMNS:
+        return pd.to_datetime(value, errors="coerce", format="ISO8601") if value is not None and value != "" else pd.NaT
+    if col in NUMERIC_COLUMNS:
+        return pd.to_numeric(value, errors="coerce")
+    if col == "priority":
+        return pd.to_numeric(value, errors="coerce")
+    if col in ("status", "tag") and value == "":
+        return None
+    return value
+
+
+def set_task_fields(df, pos, fields, columns):
+    # In-place single-row edit; unseen category values are added to the column first
+    for col, value in fields.items():
+        value = coerce_value(col, value)
+        if col in CATEGORICAL_COLUMNS and pd.notna(value) and value not in df[col].cat.categories:
+            df[col] = df[col].cat.add_categories([value])
+        df.iat[pos, columns[col]] = value
+
+
+def set_tasks_field(df, positions, col, values):
+    # set_task_fields for one column over many rows at once; `values` is one
+    # value for all of them or a sequence aligned with `positions`
+    if not pd.api.types.is_list_like(values):
+        values = [values] * len(positions)
+    typed = _typed_column(col, pd.Series(list(values), dtype=object))
+    if col in CATEGORICAL_COLUMNS:
+        missing = pd.Index(typed.dropna().unique()).difference(df[col].cat.categories, sort=False)
+        if len(missing):
+            df[col] = df[col].cat.add_categories(missing)
+        typed = typed.astype(object)
+    df.iloc[positions, df.columns.get_loc(col)] = typed.to_numpy()
+
+
+def append_tasks(df, rows):
+    # Concatenates typed frames; categories are unioned first so the result stays categorical
+    # and the existing rows are not re-typed
+    df = df.copy(deep=False)
+    rows = rows.copy(deep=False)
+    for col in CATEGORICAL_COLUMNS.keys() & set(df.columns):
+        missing = rows[col].cat.categories.difference(df[col].cat.categories, sort=False)
+        if len(missing):
+            df[col] = df[col].cat.add_categories(missing)
+        rows[col] = rows[col].cat.set_categories(df[col].cat.categories)
+    return pd.concat([df, rows], ignore_index=True)
+
+
+def storage_value(col, value):
+    # The on-disk form of one field: dates as ISO strings, missing values as None
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    if col in DATE_COLUMNS:
+        value = pd.Timestamp(value)
+        return value.strftime("%Y-%m-%d") if col == "due_date" else value.isoformat()
+    if col == "id":
+        return str(value)
+    return value.item() if hasattr(value, "item") else value
+
+
+def _iso_strings(series, unit):
+    # Same text as .dt.strftime("%Y-%m-%d" / "%Y-%m-%dT%H:%M:%S.%f"), formatted in C instead of per value
+    values = series.to_numpy(dtype="datetime64[us]")
+    text = np.datetime_as_string(values, unit=unit).astype(object)
+    text[np.isnat(values)] = None
+    return pd.Series(text, index=series.index, dtype=object)
+
+
+def storage_frame(df):
+    # Typed frame -> the text/number columns the CSV and SQLite backends have always stored
+    out = pd.DataFrame({
+        "id": df["id"].astype(str).astype(object),
+        "title": df["title"].astype(object),
+        "status": df["status"].astype(object),
+        "priority": df["priority"].astype(object),
+        "tag": df["tag"].astype(object),
+        "due_date": _iso_strings(df["due_date"], "D"),
+        "created_at": _iso_strings(df["created_at"], "us"),
+        "completed_at": _iso_strings(df["completed_at"], "us"),
+        # float32 -> float64 through the shortest repr, so 1.1 is stored as 1.1
+        "estimated_hours": df["estimated_hours"].astype(float).round(6).astype(object),
+        "actual_hours": df["actual_hours"].astype(float).round(6).astype(object),
+    }, index=df.index)
+    return out.where(pd.notna(out), None)
+
+
+# ------------------- Task Ids -------------------
+# Ids are int64, ULID-style: milliseconds since the epoch in the high bits and
+# a 16-bit sequence below, started at a random point each millisecond so two
+# processes creating tasks at the same moment are unlikely to meet. Within a
+# process they only ever increase, also across a clock step back, and blocks
+# for bulk inserts are reserved in one go. Every id is above the ids older
+# versions made (the creation timestamp with its dot removed, up to 16 digits),
+# so sorting by id still sorts by creation.
+ID_SEQUENCE_BITS = 16
+
+
+class TaskIdGenerator:
+    def __init__(self):
+        self._last = 0
+        self._lock = threading.Lock()
+
+    def reserve(self, count=1, above=None):
+        # First of `count` consecutive fresh ids, all greater than `above` if given
+        with self._lock:
+            now = (time.time_ns() // 1_000_000) << ID_SEQUENCE_BITS
+            first = max(now | random.getrandbits(ID_SEQUENCE_BITS - 1), self._last + 1)
+            if above is not None:
+                first = max(first, int(above) + 1)
+            self._last = first + count - 1
+            return first
+
+
+task_ids = TaskIdGenerator()
+
+
+def new_task_id(above=None):
+    return task_ids.reserve(1, above)
+
+
+def new_task_ids(count, above=None):
+    first = task_ids.reserve(count, above)
+    return np.arange(first, first + count, dtype="int64")
+
+
+def resolve_duplicate_ids(df):
+    # Older versions could hand two tasks created in the same instant the same
+    # id; every repeat after the first gets a fresh id. Returns the frame and
+    # how many ids changed.
+    repeated = df["id"].duplicated().to_numpy()
+    if not repeated.any():
+        return df, 0
+    ids = df["id"].to_numpy(dtype="int64").copy()
+    ids[repeated] = new_task_ids(int(repeated.sum()), above=ids.max())
+    df = df.copy(deep=False)
+    df["id"] = ids
+    return df, int(repeated.sum())
+
+
+# ------------------- Time Windows -------------------
+# A window is (start, end): start inclusive, end exclusive, either side None
+# for open. A task is in it when it was created or completed inside it.
+# Windows are answered in memory (see TimeIndex in repository.py), not by the stores.
+WINDOW_COLUMNS = ["created_at", "completed_at"]
+
+
+def memory_report(df):
+    # Bytes per column for one session's task frame, plus the total
+    usage = df.memory_usage(index=True, deep=True)
+    return {"rows": len(df), "columns": {col: int(usage[col]) for col in df.columns}, "total": int(usage.sum())}
+
+
+def apply_changes(df, changes):
+    # Replays journaled insert/update/delete operations onto a loaded frame
+    positions = {task_id: pos for pos, task_id in enumerate(df["id"].tolist())}
+    columns = {col: i for i, col in enumerate(df.columns)}
+    pending = {}
+    dropped = set()
+    edited = set()
+    for change in changes:
+        task_id = int(change["id"])
+        if change["op"] == "insert":
+            pending[task_id] = dict(change["task"], id=task_id)
+        elif change["op"] == "update":
+            if task_id in pending:
+                pending[task_id].update(change["fields"])
+            elif task_id in positions:
+                fields = change["fields"]
+                # Columns read zero-copy from Parquet's Arrow buffers are read-only until copied
+                for col in fields.keys() - edited:
+                    df[col] = df[col].copy()
+                edited.update(fields)
+                set_task_fields(df, positions[task_id], fields, columns)
+        elif change["op"] == "delete":
+            if pending.pop(task_id, None) is None and task_id in positions:
+                dropped.add(positions[task_id])
+    if dropped:
+        df = df.drop(index=df.index[sorted(dropped)])
+    if pending:
+        df = append_tasks(df, ensure_columns(pd.DataFrame(list(pending.values()), columns=TASK_COLUMNS)))
+    return ensure_columns(df.reset_index(drop=True))
+
+
+def coalesce_changes(changes):
+    # Folds a run of journal ops into at most one op per task: updates merge into
+    # the pending insert or update, and a delete cancels an insert it follows
+    merged = {}
+    for change in changes:
+        task_id = str(change["id"])
+        previous = merged.get(task_id)
+        if change["op"] == "update" and previous is not None and previous["op"] != "delete":
+            key = "task" if previous["op"] == "insert" else "fields"
+            previous[key] = {**previous[key], **change["fields"]}
+        elif change["op"] == "delete" and previous is not None and previous["op"] == "insert":
+            del merged[task_id]
+        else:
+            merged[task_id] = {**change, "id": task_id}
+    return list(merged.values())
+
+
+def _json_default(value):
+    # numpy scalars and timestamps coming out of DataFrames and widgets
+    if hasattr(value, "item"):
+        return value.item()
+    if hasattr(value, "isoformat"):
+        return None if pd.isna(value) else value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def insert_changes(df):
+    # Journal insert ops for every row of a typed frame
+    return [
+        {"op": "insert", "id": record["id"], "task": record}
+        for record in storage_frame(df)[TASK_COLUMNS].to_dict("records")
+    ]
+
+
+def _to_records(df):
+    # sqlite3 has no notion of NaN, so missing values go in as NULL
+    df = storage_frame(df)[TASK_COLUMNS]
+    return [tuple(row) for row in df.itertuples(index=False, name=None)]
+
+
+# ------------------- Frame Cache Access -------------------
+# What every store shares with the process-wide frame cache, keyed by its
+# cache_key(user) and checked against its signature(user).
+class CachedFrames:
+    # Lets the repository hand back its up-to-date frame after one of our own writes;
+    # the size is carried forward from the last put instead of measured again
+    def cache_frame(self, user, df, signature=None):
+        frame_cache.put(self.cache_key(user), signature or self.signature(user), df, carry_size=True)
+
+    def data_version(self, user):
+        return frame_cache.version(self.cache_key(user))
+
+    def invalidate_cache(self, user):
+        frame_cache.invalidate(self.cache_key(user))
+
+
+# ------------------- CSV Backend -------------------
+# Single-row edits are appended to tasks_<user>.journal and replayed on load.
+# The journal is folded back into the CSV every JOURNAL_COMPACT_EVERY entries or on a full save.
+# Every write holds an advisory lock on the user's files (other processes
+# included) and full rewrites go through a temp file and an atomic rename.
+class CsvTaskStore(CachedFrames):
+    name = "csv"
+
+    def __init__(self, compact_every=JOURNAL_COMPACT_EVERY):
+        self.compact_every = compact_every
+        self._journal_lengths = {}
+        self._ids_checked = set()
+        self._lock = threading.Lock()
+
+    def user_file(self, user):
+        return f"tasks_{user}.csv"
+
+    def journal_file(self, user):
+        return f"tasks_{user}.journal"
+
+    def cache_key(self, user):
+        return (self.name, os.path.abspath(self.user_file(user)))
+
+    def signature(self, user):
+        return file_signature(self.user_file(user), self.journal_file(user))
+
+    def init_user(self, user):
+        f = self.user_file(user)
+        if not os.path.exists(f):
+            with self._lock, file_lock(f):
+                if not os.path.exists(f):
+                    self._write_tasks(user, ensure_columns(empty_tasks()))
+        # Once per process: files from older versions may hold repeated ids
+        if user not in self._ids_checked:
+            if self.load(user)["id"].duplicated().any():
+                self.upgrade_ids(user)
+            self._ids_checked.add(user)
+
+    def upgrade_ids(self, user):
+        # Gives every task that shares its id with an earlier one an id of its own.
+        # The journal is folded in first, so its edits stay on the tasks they were made to.
+        with self._lock, file_lock(self.user_file(user)):
+            tasks = self._read_tasks(user)
+            changes = self._read_journal(user)
+            df, changed = resolve_duplicate_ids(apply_changes(tasks, changes) if changes else tasks)
+            if changed:
+                self._write_tasks(user, df)
+            return changed
+
+    def load(self, user):
+        signature = self.signature(user)
+        df = frame_cache.get(self.cache_key(user), signature)
+        if df is not None:
+            return df
+        f = self.user_file(user)
+        # Shared lock: a compaction can't swap the file and drop the journal between our two reads
+        with file_lock(f, shared=True):
+            signature = self.signature(user)
+            df = self._read_tasks(user)
+            changes = self._read_journal(user)
+        if changes:
+            df = apply_changes(df, changes)
+        frame_cache.put(self.cache_key(user), signature, df.copy())
+        return df
+
+    def save(self, user, df, expected=None):
+        # Replaces the whole task list; with `expected`, only if nobody wrote since that signature
+        with self._lock, file_lock(self.user_file(user)):
+            if expected is not None and self.signature(user) != expected:
+                raise StaleWriteError(f"Tasks for {user} changed since they were loaded")
+            self._write_tasks(user, df)
+            return self.signature(user)
+
+    def insert(self, user, task, expected=None):
+        return self.write_changes(user, [{"op": "insert", "id": str(task["id"]), "task": task}], expected)
+
+    def update(self, user, task_id, fields, expected=None):
+        return self.write_changes(user, [{"op": "update", "id": str(task_id), "fields": fields}], expected)
+
+    def delete(self, user, task_id, expected=None):
+        return self.write_changes(user, [{"op": "delete", "id": str(task_id)}], expected)
+
+    def insert_many(self, user, df, expected=None):
+        # Small batches are one journal append; a batch that would trip a compaction
+        # anyway is folded straight into a single rewrite of the file
+        if len(df) < self.compact_every:
+            return self.write_changes(user, insert_changes(df), expected)
+        with self._lock, file_lock(self.user_file(user)):
+            current = expected is None or self.signature(user) == expected
+            tasks = self._read_tasks(user)
+            changes = self._read_journal(user)
+            self._write_tasks(user, append_tasks(apply_changes(tasks, changes) if changes else tasks, df))
+            return self.signature(user) if current else None
+
+    def compact(self, user):
+        with self._lock, file_lock(self.user_file(user)):
+            self._compact(user)
+
+    def _compact(self, user):
+        # Caller holds both locks
+        df = self._read_tasks(user)
+        changes = self._read_journal(user)
+        self._write_tasks(user, apply_changes(df, changes) if changes else df)
+
+    def _read_tasks(self, user):
+        f = self.user_file(user)
+        if not os.path.exists(f):
+            return ensure_columns(empty_tasks())
+        instrumentation.count(bytes_read=os.path.getsize(f))
+        return ensure_columns(self._read_file(f))
+
+    def _write_tasks(self, user, df):
+        frame_cache.invalidate(self.cache_key(user))
+        atomic_write(self.user_file(user), lambda f: self._write_file(f, df), binary=self.binary)
+        # Only once the new file is in place, so a crash in between replays a journal already folded in
+        # (re-applying the same ops is harmless) instead of losing it
+        if os.path.exists(self.journal_file(user)):
+            os.remove(self.journal_file(user))
+        self._journal_lengths[user] = 0
+
+    # The file format; ParquetTaskStore swaps these two out
+    binary = False
+
+    def _read_file(self, path):
+        # Older files may lack a column: ensure_columns adds it back
+        return pd.read_csv(path, usecols=lambda col: col in TASK_COLUMNS)
+
+    def _write_file(self, f, df):
+        storage_frame(df).to_csv(f, index=False)
+
+    def _read_journal(self, user):
+        f = self.journal_file(user)
+        if not os.path.exists(f):
+            return []
+        instrumentation.count(bytes_read=os.path.getsize(f))
+        with open(f, encoding="utf-8") as journal:
+            # A torn line from a crash mid-append is skipped
+            changes = []
+            for line in journal:
+                try:
+                    changes.append(json.loads(line))
+                except ValueError:
+                    continue
+        return changes
+
+    def write_changes(self, user, changes, expected=None, durable=True):
+        # Appends a batch of journal ops in one write and, if durable, one fsync.
+        # Returns the signature after the write, or None when someone else wrote
+        # since `expected` and the caller's copy has to be reloaded
+        lines = "".join(json.dumps(change, default=_json_default) + "\n" for change in changes)
+        instrumentation.count(bytes_written=len(lines.encode("utf-8")))
+        with self._lock, file_lock(self.user_file(user)):
+            current = expected is None or self.signature(user) == expected
+            frame_cache.invalidate(self.cache_key(user))
+            # Other processes append too, so the count is re-read whenever we were not the last writer
+            if user not in self._journal_lengths or not current:
+                self._journal_lengths[user] = len(self._read_journal(user))
+            with open(self.journal_file(user), "a", encoding="utf-8") as journal:
+                journal.write(lines)
+                journal.flush()
+                if durable:
+                    os.fsync(journal.fileno())
+            self._journal_lengths[user] += len(changes)
+            if self._journal_lengths[user] >= self.compact_every:
+                self._compact(user)
+            return self.signature(user) if current else None
+
+
+
+# ------------------- Parquet Backend -------------------
+# Columnar files with the in-memory schema (categoricals as dictionaries,
+# datetimes as timestamps, float32 hours), so loading skips CSV parsing and
+# date conversion.
+# Pages are compressed, so the columns are always decoded into fresh Arrow
+# buffers (memory-mapping the file saves nothing); the frame then uses those
+# buffers without another copy. Single-task edits use the same journal as
+# the CSV backend.
+# pyarrow is optional and only imported when this backend is used.
+def parquet_schema():
+    import pyarrow as pa
+
+    return pa.schema([
+        ("id", pa.int64()),
+        ("title", pa.string()),
+        ("status", pa.dictionary(pa.int8(), pa.string())),
+        ("priority", pa.dictionary(pa.int8(), pa.int64(), ordered=True)),
+        ("tag", pa.dictionary(pa.int16(), pa.string())),
+        ("due_date", pa.timestamp("us")),
+        ("created_at", pa.timestamp("us")),
+        ("completed_at", pa.timestamp("us")),
+        ("estimated_hours", pa.float32()),
+        ("actual_hours", pa.float32()),
+    ])
+
+
+class ParquetTaskStore(CsvTaskStore):
+    name = "parquet"
+    binary = True
+
+    def __init__(self, compact_every=JOURNAL_COMPACT_EVERY):
+        try:
+            import pyarrow.parquet  # noqa: F401
+        except ImportError as e:
+            raise RuntimeError("The parquet task backend needs pyarrow: pip install pyarrow") from e
+        super().__init__(compact_every)
+        self._csv = CsvTaskStore()
+
+    def user_file(self, user):
+        return f"tasks_{user}.parquet"
+
+    def journal_file(self, user):
+        return f"tasks_{user}.parquet.journal"
+
+    def init_user(self, user):
+        self.migrate_user(user)
+        super().init_user(user)
+
+    def migrate_user(self, user):
+        # The first time a user is seen, their CSV (journal included) becomes the Parquet file
+        f = self.user_file(user)
+        if os.path.exists(f):
+            return 0
+        with self._lock, file_lock(f):
+            if os.path.exists(f):
+                return 0
+            source = self._csv.user_file(user)
+            df = self._csv.load(user) if os.path.exists(source) else ensure_columns(empty_tasks())
+            df, _ = resolve_duplicate_ids(df)
+            self._write_tasks(user, df)
+        return len(df)
+
+    def _read_file(self, path):
+        import pyarrow.parquet as pq
+
+        # One block per column, each released from the table as it is converted: a lower peak
+        # than building consolidated blocks next to the whole table (see bench_memory)
+        return pq.read_table(path, columns=TASK_COLUMNS).to_pandas(self_destruct=True, split_blocks=True)
+
+    def _write_file(self, f, df):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pa.Table.from_pandas(df[TASK_COLUMNS], schema=parquet_schema(), preserve_index=False)
+        pq.write_table(table, f)
+
+
+# ------------------- SQLite Backend -------------------
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    user TEXT NOT NULL,
+    id TEXT NOT NULL,
+    title TEXT,
+    status TEXT,
+    priority INTEGER,
+    tag TEXT,
+    due_date TEXT,
+    created_at TEXT,
+    completed_at TEXT,
+    estimated_hours REAL,
+    actual_hours REAL,
+    PRIMARY KEY (user, id)
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_user_status ON tasks (user, status);
+CREATE INDEX IF NOT EXISTS idx_tasks_user_priority ON tasks (user, priority);
+CREATE INDEX IF NOT EXISTS idx_tasks_user_due_date ON tasks (user, due_date);
+-- Date windows are answered in memory; these only slowed down every write
+DROP INDEX IF EXISTS idx_tasks_user_created_at;
+DROP INDEX IF EXISTS idx_tasks_user_completed_at;
+CREATE TABLE IF NOT EXISTS task_versions (
+    user TEXT PRIMARY KEY,
+    version INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS csv_migrations (
+    user TEXT PRIMARY KEY,
+    source TEXT,
+    rows INTEGER,
+    migrated_at TEXT
+);
+"""
+SQLITE_INSERT = f"INSERT INTO tasks (user, {', '.join(TASK_COLUMNS)}) VALUES (?, {', '.join('?' * len(TASK_COLUMNS))})"
+SQLITE_UPSERT = SQLITE_INSERT.replace("INSERT", "INSERT OR REPLACE", 1)
+SQLITE_BUMP_VERSION = "INSERT INTO task_versions (user, version) VALUES (?, 1) ON CONFLICT (user) DO UPDATE SET version = version + 1"
+
+
+class SqliteTaskStore(CachedFrames):
+    name = "sqlite"
+
+    def __init__(self, path=TASK_DB_FILE):
+        self.path = path
+        self._local = threading.local()
+        self._csv = CsvTaskStore()
+        self.connect().executescript(SQLITE_SCHEMA)
+
+    # Streamlit serves every session from its own thread, so each thread gets its own connection
+    def connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def init_user(self, user):
+        self.migrate_user(user)
+
+    def cache_key(self, user):
+        return ("sqlite", os.path.abspath(self.path), user)
+
+    # WAL checkpoints rewrite the database files without changing any data, so
+    # instead of file stats every write bumps a per-user counter in the same transaction
+    def signature(self, user):
+        row = self.connect().execute("SELECT version FROM task_versions WHERE user = ?", (user,)).fetchone()
+        return (os.path.abspath(self.path), row[0] if row else 0)
+
+    def migrate_user(self, user):
+        conn = self.connect()
+        if conn.execute("SELECT 1 FROM csv_migrations WHERE user = ?", (user,)).fetchone():
+            return 0
+        f = self._csv.user_file(user)
+        df = self._csv.load(user) if os.path.exists(f) else ensure_columns(empty_tasks())
+        # The primary key would otherwise keep only the last of the tasks sharing an id
+        df, _ = resolve_duplicate_ids(df)
+        frame_cache.invalidate(self.cache_key(user))
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            # Another process may have migrated this user while we were reading the CSV
+            if conn.execute("SELECT 1 FROM csv_migrations WHERE user = ?", (user,)).fetchone():
+                return 0
+            conn.executemany(
+                SQLITE_UPSERT,
+                [(user,) + record for record in _to_records(df)],
+            )
+            conn.execute(
+                "INSERT INTO csv_migrations (user, source, rows, migrated_at) VALUES (?, ?, ?, ?)",
+                (user, f if os.path.exists(f) else None, len(df), datetime.now().isoformat()),
+            )
+            conn.execute(SQLITE_BUMP_VERSION, (user,))
+        return len(df)
+
+    def load(self, user):
+        signature = self.signature(user)
+        df = frame_cache.get(self.cache_key(user), signature)
+        if df is not None:
+            return df
+        conn = self.connect()
+        # One read transaction, so the version and the rows come from the same snapshot
+        with conn:
+            conn.execute("BEGIN")
+            signature = self.signature(user)
+            df = pd.read_sql_query(
+                f"SELECT {', '.join(TASK_COLUMNS)} FROM tasks WHERE user = ? ORDER BY rowid",
+                conn,
+                params=(user,),
+            )
+        df = ensure_columns(df)
+        frame_cache.put(self.cache_key(user), signature, df.copy())
+        return df
+
+    def save(self, user, df, expected=None):
+        def replace_all(conn):
+            conn.execute("DELETE FROM tasks WHERE user = ?", (user,))
+            conn.executemany(
+                SQLITE_INSERT,
+                [(user,) + record for record in _to_records(df)],
+            )
+        return self._write(user, replace_all, expected, strict=True)
+
+    def insert(self, user, task, expected=None):
+        record = _to_records(ensure_columns(pd.DataFrame([task])))[0]
+        return self._write(user, lambda conn: conn.execute(SQLITE_INSERT, (user,) + record), expected)
+
+    def update(self, user, task_id, fields, expected=None):
+        unknown = set(fields) - set(TASK_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown task fields: {sorted(unknown)}")
+        assignments = ", ".join(f"{col} = ?" for col in fields)
+
+        def update_row(conn):
+            cursor = conn.execute(
+                f"UPDATE tasks SET {assignments} WHERE user = ? AND id = ?",
+                tuple(storage_value(col, value) for col, value in fields.items()) + (user, str(task_id)),
+            )
+            if cursor.rowcount == 0:
+                raise StaleWriteError(f"Task {task_id} no longer exists")
+        return self._write(user, update_row, expected)
+
+    def delete(self, user, task_id, expected=None):
+        return self._write(user, lambda conn: conn.execute("DELETE FROM tasks WHERE user = ? AND id = ?", (user, str(task_id))), expected)
+
+    def insert_many(self, user, df, expected=None):
+        records = [(user,) + record for record in _to_records(df)]
+        return self._write(user, lambda conn: conn.executemany(SQLITE_INSERT, records), expected)
+
+    def write_changes(self, user, changes, expected=None, durable=True):
+        # A batch of journal ops in one transaction. Unlike update(), an update
+        # for a task deleted elsewhere in the meantime is skipped, not an error.
+        for change in changes:
+            if change["op"] == "update" and set(change["fields"]) - set(TASK_COLUMNS):
+                raise ValueError(f"Unknown task fields: {sorted(set(change['fields']) - set(TASK_COLUMNS))}")
+
+        # Every inserted task is typed in one frame instead of one frame each
+        inserts = [change["task"] for change in changes if change["op"] == "insert"]
+        records = iter(_to_records(ensure_columns(pd.DataFrame(inserts, columns=TASK_COLUMNS)))) if inserts else iter(())
+
+        def apply_batch(conn):
+            for change in changes:
+                if change["op"] == "insert":
+                    conn.execute(SQLITE_INSERT, (user,) + next(records))
+                elif change["op"] == "update":
+                    fields = change["fields"]
+                    conn.execute(
+                        f"UPDATE tasks SET {', '.join(f'{col} = ?' for col in fields)} WHERE user = ? AND id = ?",
+                        tuple(storage_value(col, value) for col, value in fields.items()) + (user, str(change["id"])),
+                    )
+                elif change["op"] == "delete":
+                    conn.execute("DELETE FROM tasks WHERE user = ? AND id = ?", (user, str(change["id"])))
+
+        if durable:
+            return self._write(user, apply_batch, expected)
+        conn = self.connect()
+        conn.execute("PRAGMA synchronous=OFF")
+        try:
+            return self._write(user, apply_batch, expected)
+        finally:
+            conn.execute("PRAGMA synchronous=NORMAL")
+
+    def _write(self, user, apply, expected=None, strict=False):
+        # Returns the signature after the write, or None when someone else wrote
+        # since `expected` and the caller's copy has to be reloaded. With `strict`
+        # such a write is refused instead.
+        frame_cache.invalidate(self.cache_key(user))
+        conn = self.connect()
+        with conn:
+            # IMMEDIATE takes the write lock up front, so the version can't move between check and write
+            conn.execute("BEGIN IMMEDIATE")
+            before = self.signature(user)
+            current = expected is None or before == expected
+            if strict and not current:
+                raise StaleWriteError(f"Tasks for {user} changed since they were loaded")
+            apply(conn)
+            conn.execute(SQLITE_BUMP_VERSION, (user,))
+        return (before[0], before[1] + 1) if current else None
+
+
+# ------------------- Backend Selection -------------------
+TASK_STORES = {"csv": CsvTaskStore, "sqlite": SqliteTaskStore, "parquet": ParquetTaskStore}
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_task_store(backend=None):
+    backend = backend or TASK_BACKEND
+    if backend not in TASK_STORES:
+        raise ValueError(f"Unknown task backend '{backend}', expected one of {sorted(TASK_STORES)}")
+    with _stores_lock:
+        if backend not in _stores:
+            _stores[backend] = TASK_STORES[backend]()
+        return _stores[backend]
+
+
+def migrate_csv_files(store=None):
+    store = store or get_task_store("sqlite")
+    migrated = {}
+    for name in sorted(os.listdir(".")):
+        if name.startswith("tasks_") and name.endswith(".csv"):
+            user = name[len("tasks_"):-len(".csv")]
+            migrated[user] = store.migrate_user(user)
+    return migrated
+
+
+if __name__ == "__main__":
+    # One-shot migration: python storage.py migrate [sqlite|parquet]
+    if sys.argv[1:2] == ["migrate"] and len(sys.argv) <= 3 and sys.argv[2:] in ([], ["sqlite"], ["parquet"]):
+        for user, rows in migrate_csv_files(get_task_store((sys.argv[2:] or ["sqlite"])[0])).items():
+            print(f"{user}: {rows} tasks migrated")
+    else:
+        print("usage: python storage.py migrate [sqlite|parquet]")
@@ -0,0 +1,136 @@
+import csv
+import io
+import os
+import threading
+
+from fileio import atomic_write
+
+try:
+    import fcntl
+except ImportError:  # Windows: appends stay atomic, cross-process registration checks do not
+    fcntl = None
+
+USERS_FILE = os.environ.get("USERS_FILE", "users.csv")
+USER_COLUMNS = ["username", "password"]
+
+
+# ------------------- User Index -------------------
+# users.csv is treated as an append-only log. The index keeps a dict keyed by
+# lowercased username and only reads bytes appended since the last lookup, so
+# login and registration checks are a stat() plus a hash lookup.
+class UserIndex:
+    def __init__(self, path=USERS_FILE):
+        self.path = path
+        self._users = {}
+        self._offset = 0
+        self._inode = None
+        self._columns = [0, 1]
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            self._refresh()
+            return len(self._users)
+
+    def exists(self, username):
+        with self._lock:
+            self._refresh()
+            return username.lower() in self._users
+
+    def password_hash(self, username):
+        with self._lock:
+            self._refresh()
+            return self._users.get(username.lower())
+
+    def add_user(self, username, password_hash):
+        username = username.lower()
+        line = self._format_row([username, password_hash])
+        with self._lock:
+            self._refresh()
+            while True:
+                fd = os.open(self.path, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o644)
+                try:
+                    if fcntl is not None:
+                        fcntl.flock(fd, fcntl.LOCK_EX)
+                    # Another process may have registered the same name since our last read
+                    self._refresh()
+                    if os.fstat(fd).st_ino != os.stat(self.path).st_ino:
+                        # The file was replaced (reset by that refresh, or by another process)
+                        # after we opened it: appending here would land in the unlinked copy
+                        continue
+                    if username in self._users:
+                        return False
+                    size = os.fstat(fd).st_size
+                    if size == 0:
+                        line = self._format_row(USER_COLUMNS) + line
+                    elif not self._ends_with_newline(fd, size):
+                        # Never glue the record onto an unterminated last row
+                        line = "\n" + line
+                    # One write() on an O_APPEND descriptor lands as a single, unsplit record
+                    os.write(fd, line.encode("utf-8"))
+                    os.fsync(fd)
+                    break
+                finally:
+                    os.close(fd)
+            self._refresh()
+            return True
+
+    def _ends_with_newline(self, fd, size):
+        # A seek and read instead of os.pread (not on Windows); O_APPEND writes still go to the end
+        os.lseek(fd, size - 1, os.SEEK_SET)
+        return os.read(fd, 1) == b"\n"
+
+    def _format_row(self, values):
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator="\n").writerow(values)
+        return buffer.getvalue()
+
+    def _refresh(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            self._users, self._offset, self._inode = {}, 0, None
+            return
+        if stat.st_ino != self._inode or stat.st_size < self._offset:
+            # Replaced or truncated underneath us: start over
+            self._users, self._offset, self._inode = {}, 0, stat.st_ino
+        if stat.st_size == self._offset:
+            return
+        with open(self.path, "rb") as f:
+            f.seek(self._offset)
+            chunk = f.read(stat.st_size - self._offset)
+        # Leave a half-written trailing row for the next refresh
+        end = chunk.rfind(b"\n") + 1
+        if end == 0:
+            return
+        rows = csv.reader(io.StringIO(chunk[:end].decode("utf-8")))
+        if self._offset == 0:
+            header = next(rows, [])
+            if not all(col in header for col in USER_COLUMNS):
+                # Unreadable users file: reset it to an empty one, as the app always has
+                self._reset_file()
+                return
+            self._columns = [header.index(col) for col in USER_COLUMNS]
+        for row in rows:
+            if len(row) > max(self._columns):
+                username, password = (row[i] for i in self._columns)
+                # First registration wins, as with the old top-to-bottom scan
+                self._users.setdefault(username.lower(), password)
+        self._offset += end
+
+    def _reset_file(self):
+        header = self._format_row(USER_COLUMNS)
+        atomic_write(self.path, lambda f: f.write(header))
+        self._users, self._offset, self._inode = {}, 0, None
+
+
+_user_index = None
+_user_index_lock = threading.Lock()
+
+
+def get_user_index():
+    global _user_index
+    with _user_index_lock:
+        if _user_index is None:
+            _user_index = UserIndex()
+        return _user_index